@@ -0,0 +1,74 @@
+"""
+Regenerate the chapter manifests that run on manifest_core in one process.
+
+Each generate_chapter_manifest_<scripture>.py script still works on its own; this
+runner imports their CONFIGs instead, so the interpreter, the shared engine and
+each script's compiled regexes are loaded once for the whole batch.
+
+Usage:
+    python build_all_manifests.py                       # every scripture
+    python build_all_manifests.py --scripture kamasutra # just one (repeatable)
+"""
+
+import argparse
+import sys
+
+import generate_chapter_manifest_arthasastra
+import generate_chapter_manifest_bhagvata_purana
+import generate_chapter_manifest_carak_samhita
+import generate_chapter_manifest_kamasutra
+import generate_chapter_manifest_natyashastra
+import generate_chapter_manifest_panchatantra
+import generate_chapter_manifest_ramayana
+import generate_chapter_manifest_sushruta_samhita
+import generate_chapter_manifest_vastu_sastra
+import generate_chapter_manifest_vedanga_jyotisa
+import generate_chapter_manifest_yogasutra
+from manifest_core import build_manifest, print_banner
+
+CONFIGS = [
+    generate_chapter_manifest_arthasastra.CONFIG,
+    generate_chapter_manifest_bhagvata_purana.CONFIG,
+    generate_chapter_manifest_carak_samhita.CONFIG,
+    generate_chapter_manifest_kamasutra.CONFIG,
+    generate_chapter_manifest_natyashastra.CONFIG,
+    generate_chapter_manifest_panchatantra.CONFIG,
+    generate_chapter_manifest_ramayana.CONFIG,
+    generate_chapter_manifest_sushruta_samhita.CONFIG,
+    generate_chapter_manifest_vastu_sastra.CONFIG,
+    generate_chapter_manifest_vedanga_jyotisa.CONFIG,
+    generate_chapter_manifest_yogasutra.CONFIG,
+]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate chapter manifests in one process.")
+    parser.add_argument(
+        "--scripture",
+        action="append",
+        choices=["all"] + [config.scripture_id for config in CONFIGS],
+        help="scripture ID to build (repeatable); default: all",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    selected = args.scripture or ["all"]
+    configs = [config for config in CONFIGS if "all" in selected or config.scripture_id in selected]
+
+    print_banner("MYGURUKUL CHAPTER MANIFEST GENERATOR - ALL SCRIPTURES")
+
+    # Sequential on purpose: every build already fans its I/O out over threads,
+    # and one build at a time keeps the console output readable
+    failed = [config.scripture_name for config in configs if not build_manifest(config)]
+
+    print("\n" + "=" * 80)
+    print(f"Built {len(configs) - len(failed)} of {len(configs)} manifest(s)")
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
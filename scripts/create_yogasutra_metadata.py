@@ -1,10 +1,22 @@
+import asyncio
+import functools
+import hashlib
 import json
+import logging
 import os
 import re
+import tempfile
 import time
 from pathlib import Path
 
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+# orjson is optional; see json_compat for when the two backends agree
+from json_compat import dumps as json_dumps, loads as json_loads
+
+
+logger = logging.getLogger(__name__)
 
 
 # ============================================================================
@@ -12,6 +24,41 @@ import google.generativeai as genai
 # ============================================================================
 
 ROOT_DIRECTORY = "/Users/AJ/Desktop/mygurukul-app/Gurukul_Library/Primary_Texts/Yoga/Patanjali_Yogasutra"
+MODEL_NAME = "gemini-2.5-pro"
+
+# Per-PDF {mtime_ns, status} record kept in the root directory so reruns can skip
+# finished chapters without probing for their sidecar JSON. A PDF is redone when
+# its mtime changes or its last attempt failed; deleting a sidecar alone does not
+# regenerate it. Delete the manifest (or the PDF's entry) to force a full rescan.
+PROCESSING_MANIFEST_NAME = "processing_manifest.json"
+MANIFEST_FLUSH_INTERVAL = 20
+
+# Gemini calls in flight at once, and retry budget for 429 / RESOURCE_EXHAUSTED.
+MAX_CONCURRENCY = 8
+MAX_RETRIES = 5
+
+# Requests per minute allowed to Gemini; set GEMINI_RPM to the project's quota.
+GEMINI_RPM = int(os.environ.get("GEMINI_RPM", "30"))
+
+# Set GEMINI_BATCH=1 to submit all pending PDFs as one Gemini Batch API job (half
+# the per-token price, results within 24h) instead of interactive calls. The batch
+# path uses the google-genai client: pip install google-genai
+USE_BATCH_API = os.environ.get("GEMINI_BATCH") == "1"
+BATCH_POLL_SECONDS = 30
+BATCH_TERMINAL_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+# Raw Gemini responses keyed by sha256(pdf bytes + prompt + model id). A response
+# is only cached once it parsed and its sidecar was saved, so a rerun after a
+# deleted sidecar reuses it instead of paying for another call, while a response
+# that failed to parse is asked for again. Changing the prompt or model
+# naturally misses the cache.
+RESPONSE_CACHE_DIR = Path(os.environ.get("GURUKUL_CACHE_DIR", "~/.cache/mygurukul_metadata")).expanduser()
+
+# PDFs are hashed in blocks and sent through the Files API instead of inline, so a
+# chapter is never held in memory whole. The upload name is remembered next to the
+# response cache; a rerun after a failed call reuses the server-side file (uploads
+# are kept for 48h) and it is deleted once the metadata has been saved.
+HASH_BLOCK_SIZE = 1 << 20
 
 PROMPT_TEMPLATE = """You are an erudite AI assistant steeped in Patañjali’s Yoga Sūtras, Sanskrit philology, yoga philosophy, and evidence-based contemplative science. Using only the supplied PDF chapter, produce a single, well-formed JSON object that enriches search for three audiences: (1) serious yoga practitioners/teachers, (2) scholars and mental-health researchers, (3) curious spiritual explorers.
 
@@ -35,6 +82,10 @@ Constraints:
 - Maintain a compassionate yet scholarly tone that honours the tradition while supporting modern seekers.
 """
 
+# Built once: the per-key hash suffix (prompt + model id) and the batch prompt part
+_CACHE_KEY_SUFFIX = (PROMPT_TEMPLATE + MODEL_NAME).encode("utf-8")
+_PROMPT_PART = {"text": PROMPT_TEMPLATE}
+
 
 # ============================================================================
 # API CONFIGURATION
@@ -50,6 +101,61 @@ def configure_api() -> None:
     print("Google Generative AI API configured successfully")
 
 
+@functools.lru_cache(maxsize=1)
+def _model() -> genai.GenerativeModel:
+    """Return the shared Gemini model; one instance serves every PDF."""
+
+    return genai.GenerativeModel(MODEL_NAME)
+
+
+class RateLimiter:
+    """Token bucket admitting at most `rate` calls per `period` seconds."""
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.period)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return self
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def _rate_limiter() -> RateLimiter:
+    """Return the shared limiter; built lazily so it binds to the running loop."""
+
+    return RateLimiter(GEMINI_RPM)
+
+
+async def generate_with_retry(contents):
+    """Call Gemini, backing off exponentially while the API reports rate limiting."""
+
+    delay = 2.0
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            async with _rate_limiter():
+                return await _model().generate_content_async(contents)
+        except google_exceptions.ResourceExhausted:
+            if attempt == MAX_RETRIES:
+                raise
+            logger.warning("Rate limited by Gemini; retrying in %.0fs (attempt %d/%d)", delay, attempt, MAX_RETRIES)
+            await asyncio.sleep(delay)
+            delay *= 2
+
+
 # ============================================================================
 # HELPERS
 # ============================================================================
@@ -67,11 +173,11 @@ def clean_response_text(text: str) -> str:
     if start != -1 and end != -1 and end > start:
         return text[start : end + 1]
 
-    print("Warning: Could not isolate JSON in response.")
+    logger.warning("Could not isolate JSON in response.")
     return ""
 
 
-def derive_title_from_filename(pdf_path: str) -> str:
+def derive_title_from_filename(pdf_path: Path) -> str:
     """Fallback chapter title from filename."""
 
     stem = Path(pdf_path).stem
@@ -80,62 +186,301 @@ def derive_title_from_filename(pdf_path: str) -> str:
     return stem.strip().title()
 
 
+def iter_pdfs(root: Path):
+    """Yield every PDF under root from a single os.scandir walk."""
+
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".pdf") and entry.is_file():
+                    yield Path(entry.path)
+
+
 def is_yoga_chapter(pdf: Path) -> bool:
     return pdf.name.lower().startswith("chapter_") and pdf.suffix.lower() == ".pdf"
 
 
+def write_json_atomic(json_path: Path, data) -> None:
+    """Write JSON via a temp file so an interrupted run never leaves a truncated file."""
+
+    tmp_path = json_path.with_name(json_path.name + ".tmp")
+    tmp_path.write_bytes(json_dumps(data))
+    os.replace(tmp_path, json_path)
+
+
+def load_processing_manifest(manifest_path: Path) -> dict:
+    """Return the previous run's {pdf_path: {"mtime_ns", "status"}} record, or {}."""
+
+    try:
+        return json_loads(manifest_path.read_bytes())
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError:
+        logger.warning("Ignoring unreadable processing manifest: %s", manifest_path)
+        return {}
+
+
+def response_cache_key(pdf_path: Path) -> str:
+    """Key a model response by the PDF bytes, the prompt and the model id."""
+
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(functools.partial(f.read, HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    digest.update(_CACHE_KEY_SUFFIX)
+    return digest.hexdigest()
+
+
+def load_cached_response(cache_key: str):
+    """Return the cached raw response text for cache_key, or None on a miss or an unreadable cache."""
+
+    try:
+        return json_loads((RESPONSE_CACHE_DIR / f"{cache_key}.json").read_bytes())["raw"]
+    except (OSError, json.JSONDecodeError, KeyError):
+        return None
+
+
+def store_cached_response(cache_key: str, response_text: str) -> None:
+    """Keep the raw and cleaned response so prompt changes can be replayed offline."""
+
+    RESPONSE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(
+        RESPONSE_CACHE_DIR / f"{cache_key}.json",
+        {"model": MODEL_NAME, "raw": response_text, "cleaned": clean_response_text(response_text)},
+    )
+
+
+def _upload_marker(cache_key: str) -> Path:
+    return RESPONSE_CACHE_DIR / f"{cache_key}.upload"
+
+
+def upload_pdf(pdf_path: Path, cache_key: str):
+    """Upload pdf_path via the Files API, reusing an earlier upload of the same bytes."""
+
+    marker = _upload_marker(cache_key)
+    try:
+        uploaded = genai.get_file(marker.read_text(encoding="utf-8").strip())
+        logger.debug("Reusing upload %s for %s", uploaded.name, pdf_path.name)
+        return uploaded
+    except (FileNotFoundError, google_exceptions.GoogleAPIError):
+        pass
+
+    uploaded = genai.upload_file(pdf_path, mime_type="application/pdf", display_name=pdf_path.name)
+    RESPONSE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    marker.write_text(uploaded.name, encoding="utf-8")
+    return uploaded
+
+
+def delete_upload(uploaded, cache_key: str) -> None:
+    """Drop the server-side copy of a PDF once its metadata is saved."""
+
+    try:
+        genai.delete_file(uploaded.name)
+    except google_exceptions.GoogleAPIError as exc:
+        logger.warning("Could not delete upload %s: %s", uploaded.name, exc)
+    _upload_marker(cache_key).unlink(missing_ok=True)
+
+
+def cache_and_release(pdf_path: Path, cache_key: str, response_text: str, uploaded) -> None:
+    """
+    Cache the response of a PDF whose sidecar is saved, then drop its upload.
+    Neither step decides the outcome: the metadata already exists, so a failure
+    here is only a warning.
+    """
+
+    try:
+        store_cached_response(cache_key, response_text)
+    except Exception as exc:
+        logger.warning("Could not cache the response for %s: %s", pdf_path.name, exc)
+    try:
+        delete_upload(uploaded, cache_key)
+    except Exception as exc:
+        logger.warning("Could not release the upload for %s: %s", pdf_path.name, exc)
+
+
 # ============================================================================
 # METADATA GENERATION
 # ============================================================================
 
 
-def generate_metadata_for_file(pdf_path: str):
-    print(f"\nProcessing: {pdf_path}")
-    try:
-        with open(pdf_path, "rb") as f:
-            pdf_data = f.read()
-
-        model = genai.GenerativeModel("gemini-2.5-pro")
-        response = model.generate_content([PROMPT_TEMPLATE, {"mime_type": "application/pdf", "data": pdf_data}])
+def save_metadata_from_response(pdf_path: Path, response_text: str):
+    """Parse a model response for pdf_path and write its sidecar JSON."""
 
-        response_text = response.text
-        print(f"Raw response length: {len(response_text)} characters")
+    cleaned = ""
+    try:
+        logger.debug("Raw response length: %d characters", len(response_text))
 
         cleaned = clean_response_text(response_text)
         if not cleaned:
             raise ValueError("Cleaned response empty; skipping JSON parse.")
 
-        print(f"Cleaned response preview: {cleaned[:160]}...")
-        metadata = json.loads(cleaned)
-        print("Metadata parsed successfully.")
+        logger.debug("Cleaned response preview: %.160s...", cleaned)
+        metadata = json_loads(cleaned)
+        logger.debug("Metadata parsed successfully.")
 
         if not metadata.get("chapterTitle"):
             fallback = derive_title_from_filename(pdf_path)
             metadata["chapterTitle"] = fallback
-            print(f"Fallback title applied: {fallback}")
+            logger.info("Fallback title applied: %s", fallback)
 
-        json_path = pdf_path.replace(".pdf", ".json")
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        json_path = pdf_path.with_suffix(".json")
+        write_json_atomic(json_path, metadata)
 
-        print(f"Saved metadata to: {json_path}")
+        logger.info("Saved metadata to: %s", json_path)
         return metadata
 
     except json.JSONDecodeError as exc:
-        print(f"Error: Failed to parse JSON for {pdf_path}: {exc}")
-        print(f"Problematic cleaned response: {cleaned[:500]}...")
+        logger.error("Failed to parse JSON for %s: %s", pdf_path, exc)
+        logger.error("Problematic cleaned response: %.500s...", cleaned)
         return None
     except Exception as exc:
-        print(f"Unexpected error while processing {pdf_path}: {exc}")
+        logger.error("Unexpected error while processing %s: %s", pdf_path, exc)
         return None
 
 
+async def generate_metadata_for_file(pdf_path: Path):
+    logger.info("Processing: %s", pdf_path)
+    try:
+        cache_key = await asyncio.to_thread(response_cache_key, pdf_path)
+        cached_text = load_cached_response(cache_key)
+        if cached_text is not None:
+            logger.info("Using cached response for %s", pdf_path.name)
+            return save_metadata_from_response(pdf_path, cached_text)
+
+        uploaded = await asyncio.to_thread(upload_pdf, pdf_path, cache_key)
+        response = await generate_with_retry([PROMPT_TEMPLATE, uploaded])
+        response_text = response.text
+    except Exception as exc:
+        logger.error("Unexpected error while processing %s: %s", pdf_path, exc)
+        return None
+
+    metadata = save_metadata_from_response(pdf_path, response_text)
+    if metadata:
+        await asyncio.to_thread(cache_and_release, pdf_path, cache_key, response_text, uploaded)
+    return metadata
+
+
+# ============================================================================
+# BATCH API
+# ============================================================================
+
+
+def build_batch_jsonl(uploads, jsonl_path: Path) -> Path:
+    """
+    Write one Batch API request line per (pdf_path, uploaded file), keyed by the
+    PDF path. PDFs are referenced by their Files API URI rather than inlined, so
+    large chapters stay under the per-request inline data limit.
+    """
+
+    with open(jsonl_path, "w", encoding="utf-8") as f:
+        for pdf_path, uploaded in uploads:
+            line = {
+                "key": str(pdf_path),
+                "request": {
+                    "contents": [
+                        {
+                            "parts": [
+                                _PROMPT_PART,
+                                {"file_data": {"mime_type": "application/pdf", "file_uri": uploaded.uri}},
+                            ]
+                        }
+                    ]
+                },
+            }
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    return jsonl_path
+
+
+def run_batch_job(uploads) -> dict:
+    """Submit (pdf_path, uploaded file) pairs as one Batch API job; return {pdf path: response text}."""
+    from google import genai as genai_client
+
+    client = genai_client.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jsonl_path = build_batch_jsonl(uploads, Path(tmp_dir) / "batch_requests.jsonl")
+        uploaded = client.files.upload(
+            file=str(jsonl_path),
+            config={"display_name": "yogasutra-metadata", "mime_type": "jsonl"},
+        )
+
+    job = client.batches.create(model=MODEL_NAME, src=uploaded.name, config={"display_name": "yogasutra-metadata"})
+    print(f"Submitted batch job {job.name} with {len(uploads)} request(s).")
+
+    while job.state.name not in BATCH_TERMINAL_STATES:
+        time.sleep(BATCH_POLL_SECONDS)
+        job = client.batches.get(name=job.name)
+        logger.debug("Batch job %s state: %s", job.name, job.state.name)
+
+    if job.state.name != "JOB_STATE_SUCCEEDED":
+        raise RuntimeError(f"Batch job {job.name} finished in state {job.state.name}")
+
+    responses = {}
+    for raw_line in client.files.download(file=job.dest.file_name).decode("utf-8").splitlines():
+        row = json_loads(raw_line)
+        response = row.get("response")
+        if not response:
+            logger.error("Batch request failed for %s: %s", row.get("key"), row.get("error"))
+            continue
+        try:
+            parts = response["candidates"][0]["content"]["parts"]
+            responses[row["key"]] = "".join(part.get("text", "") for part in parts)
+        except (KeyError, IndexError, TypeError):
+            logger.error("Malformed batch response for %s", row.get("key"))
+
+    return responses
+
+
+def generate_metadata_batch(pdf_files) -> dict:
+    """Generate metadata for pdf_files via one batch job, serving cache hits locally."""
+
+    results = {}
+    misses = []
+    for pdf_path in pdf_files:
+        cache_key = response_cache_key(pdf_path)
+        cached_text = load_cached_response(cache_key)
+        if cached_text is not None:
+            logger.info("Using cached response for %s", pdf_path.name)
+            results[str(pdf_path)] = save_metadata_from_response(pdf_path, cached_text)
+        else:
+            misses.append((pdf_path, cache_key))
+
+    # Misses go through the same Files API uploads (and upload reuse) as the
+    # one-request-per-PDF path; a PDF that cannot be uploaded is a failure
+    uploads = []
+    for pdf_path, cache_key in misses:
+        try:
+            uploads.append((pdf_path, cache_key, upload_pdf(pdf_path, cache_key)))
+        except Exception as exc:
+            logger.error("Could not upload %s: %s", pdf_path, exc)
+            results[str(pdf_path)] = None
+
+    # A failed job fails only its own PDFs; cache hits above keep their result
+    try:
+        responses = run_batch_job([(pdf_path, uploaded) for pdf_path, _, uploaded in uploads]) if uploads else {}
+    except Exception as exc:
+        logger.error("Batch job failed: %s", exc)
+        responses = {}
+
+    for pdf_path, cache_key, uploaded in uploads:
+        response_text = responses.get(str(pdf_path))
+        metadata = save_metadata_from_response(pdf_path, response_text) if response_text else None
+        if metadata:
+            cache_and_release(pdf_path, cache_key, response_text, uploaded)
+        results[str(pdf_path)] = metadata
+
+    return results
+
+
 # ============================================================================
 # DIRECTORY PROCESSING
 # ============================================================================
 
 
-def process_directory(root_dir: str) -> None:
+async def process_directory(root_dir: str) -> None:
     print("=" * 80)
     print("PATAÑJALI YOGA SŪTRA METADATA GENERATOR")
     print(f"Root Directory: {root_dir}")
@@ -146,30 +491,82 @@ def process_directory(root_dir: str) -> None:
         print(f"❌ Error: Directory does not exist: {root_dir}")
         return
 
-    pdf_files = sorted(pdf for pdf in root_path.rglob("*.pdf") if is_yoga_chapter(pdf))
+    pdf_files = sorted(pdf for pdf in iter_pdfs(root_path) if is_yoga_chapter(pdf))
     if not pdf_files:
         print("No chapter PDFs found (expected names like 'Chapter_1_...').")
         return
 
     print(f"Found {len(pdf_files)} chapter PDF(s).")
 
-    processed = skipped = failed = 0
+    manifest_path = root_path / PROCESSING_MANIFEST_NAME
+    manifest = load_processing_manifest(manifest_path)
+    pending = []
+    skipped = 0
 
     for pdf in pdf_files:
-        json_path = pdf.with_suffix(".json")
-        if json_path.exists():
-            print(f"Skipping {pdf.name} — metadata already exists.")
+        key = str(pdf)
+        mtime_ns = pdf.stat().st_mtime_ns
+        entry = manifest.get(key)
+        if entry is not None:
+            # The manifest decides: a finished, unchanged PDF is skipped with no
+            # further I/O; a replaced PDF or an earlier failure is redone
+            if entry.get("status") == "done" and entry.get("mtime_ns") == mtime_ns:
+                skipped += 1
+                continue
+        elif pdf.with_suffix(".json").exists():
+            # Not seen by a previous run, but its sidecar is already there
+            logger.info("Skipping %s — metadata already exists.", pdf.name)
+            manifest[key] = {"mtime_ns": mtime_ns, "status": "done"}
             skipped += 1
             continue
 
-        if generate_metadata_for_file(str(pdf)):
+        pending.append((pdf, mtime_ns))
+
+    processed = failed = 0
+
+    def record(pdf: Path, mtime_ns: int, metadata) -> None:
+        nonlocal processed, failed
+        if metadata:
             processed += 1
+            manifest[str(pdf)] = {"mtime_ns": mtime_ns, "status": "done"}
         else:
             failed += 1
-
-        if processed + failed < len(pdf_files) - skipped:
-            print("Waiting 3 seconds before next file...")
-            time.sleep(3)
+            manifest[str(pdf)] = {"mtime_ns": mtime_ns, "status": "failed"}
+
+        if (processed + failed) % MANIFEST_FLUSH_INTERVAL == 0:
+            write_json_atomic(manifest_path, manifest)
+
+    if USE_BATCH_API and pending:
+        try:
+            results = await asyncio.to_thread(generate_metadata_batch, [pdf for pdf, _ in pending])
+        except Exception as exc:
+            # Record every pending PDF as failed rather than losing the manifest
+            logger.error("Batch processing failed: %s", exc)
+            results = {}
+        for pdf, mtime_ns in pending:
+            record(pdf, mtime_ns, results.get(str(pdf)))
+    else:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+        async def bounded(pdf: Path, mtime_ns: int) -> None:
+            # A task that raises still counts: it is recorded as failed so the
+            # PDF is retried on the next run instead of silently dropping out
+            try:
+                async with semaphore:
+                    metadata = await generate_metadata_for_file(pdf)
+            except Exception as exc:
+                logger.error("Unexpected error while processing %s: %s", pdf, exc)
+                metadata = None
+            record(pdf, mtime_ns, metadata)
+
+        results = await asyncio.gather(*(bounded(pdf, mtime_ns) for pdf, mtime_ns in pending), return_exceptions=True)
+        # Only record() itself can still fail here (e.g. a manifest flush); the
+        # PDF is already counted, so just surface the error
+        for (pdf, _), result in zip(pending, results):
+            if isinstance(result, BaseException):
+                logger.error("Could not record result for %s: %s", pdf, result)
+
+    write_json_atomic(manifest_path, manifest)
 
     print("\n" + "=" * 80)
     print("PROCESSING COMPLETE")
@@ -186,9 +583,10 @@ def process_directory(root_dir: str) -> None:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get("GURUKUL_LOG", "INFO"), format="%(message)s")
     try:
         configure_api()
-        process_directory(ROOT_DIRECTORY)
+        asyncio.run(process_directory(ROOT_DIRECTORY))
     except Exception as exc:
         print(f"\nFatal Error: {exc}")
         raise
@@ -1,8 +1,8 @@
 import os
-import json
-from pathlib import Path
-from datetime import datetime
 import re
+from pathlib import Path
+
+from manifest_core import GCS_BUCKET, ScriptureConfig, _loads, run, write_json_atomic
 
 # ============================================================================
 # CONFIGURATION
@@ -13,9 +13,17 @@ ROOT_DIRECTORY = "/Users/AJ/Desktop/mygurukul-app/Gurukul_Library/Primary_Texts/
 
 SCRIPTURE_ID = "arthashastra"
 SCRIPTURE_NAME = "Arthashastra"
-GCS_BUCKET = "gs://mygurukul-sacred-texts-corpus"
 GCS_BASE_PATH = "Gurukul_Library/Primary_Texts/Sastras/ArthaShastra"
 
+# Compiled once; both helpers below run for every folder / chapter file
+_BOOK_RE = re.compile(r"^(?:[Aa]rthashastra_)?Book_(?P<id>[^_]+)_(?P<name>.+)$")
+_CHAPTER_RE = re.compile(r"[_-]Chapter_(?P<num>\d+)")
+
+# chapterTitle of every chapter JSON, keyed by "<book folder>/<file name>" and
+# stamped with the file's mtime. Reruns stat the chapter files and only parse the
+# ones that changed. Delete it to force a full re-read.
+TITLE_INDEX_NAME = ".chapter_title_index.json"
+
 # ============================================================================
 # HELPER FUNCTION: Extract Book info from folder name
 # ============================================================================
@@ -28,30 +36,17 @@ def extract_book_info(folder_name):
     
     Returns: (book_id, book_name, book_name_english)
     """
-    # Remove prefix if present
-    clean_name = folder_name.replace("Arthashastra_", "")
-    clean_name = clean_name.replace("arthashastra_", "")
+    match = _BOOK_RE.match(folder_name)
+    if match:
+        # Pattern: [Arthashastra_]Book_1_Concerning_Discipline
+        book_name = match["name"]
+        return match["id"], book_name, book_name.replace("_", " ")
     
-    # Try to extract Book_X_Name pattern
-    if "Book_" in clean_name:
-        # Pattern: Book_1_Concerning_Discipline
-        parts = clean_name.split("_")
-        if len(parts) >= 3 and parts[0] == "Book":
-            book_id = parts[1]  # "1", "2", "10", etc.
-            # Everything after Book_X is the name
-            book_name = "_".join(parts[2:])  # "Concerning_Discipline" or full name
-            # For English name, replace underscores with spaces and title case
-            book_name_english = " ".join(parts[2:]).replace("_", " ")
-        else:
-            book_id = "unknown"
-            book_name = clean_name
-            book_name_english = clean_name.replace("_", " ")
-    else:
-        book_id = "unknown"
-        book_name = folder_name
-        book_name_english = folder_name.replace("_", " ")
+    if "Book_" in folder_name:
+        clean_name = folder_name.replace("Arthashastra_", "").replace("arthashastra_", "")
+        return "unknown", clean_name, clean_name.replace("_", " ")
     
-    return book_id, book_name, book_name_english
+    return "unknown", folder_name, folder_name.replace("_", " ")
 
 # ============================================================================
 # HELPER FUNCTION: Extract chapter number from filename
@@ -60,20 +55,81 @@ def extract_book_info(folder_name):
 def get_chapter_number(filename):
     """Extracts the chapter number from the filename using a regular expression."""
     # Handle both patterns: Chapter_1 or -Chapter_1
-    match = re.search(r'[_-]Chapter_(\d+)', filename)
-    if match:
-        return int(match.group(1))
-    return 0  # Default if no number is found
+    match = _CHAPTER_RE.search(filename)
+    return int(match["num"]) if match else 0  # Default if no number is found
 
 # ============================================================================
-# MANIFEST GENERATION
+# HELPER FUNCTIONS: Chapter title index
 # ============================================================================
 
-def generate_chapter_manifest(scripture_root, scripture_id, scripture_name):
+def load_title_index(root_path):
+    """Return the previous run's title index, or {} if it is missing or unreadable."""
+    try:
+        return _loads((root_path / TITLE_INDEX_NAME).read_bytes())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_title_index(root_path, title_index):
+    """Write the title index via a temp file so an interrupted run never truncates it."""
+    write_json_atomic(root_path / TITLE_INDEX_NAME, title_index)
+
+def read_chapter_record(json_file, old_index, new_index):
     """
-    Scans your actual Arthashastra folder structure and generates manifest.
-    
-    Handles folder structure like:
+    Return {"mtime_ns", ["chapterTitle"]} for a chapter JSON, parsing the file
+    only when it is not in old_index with the same mtime. The record is also
+    stored in new_index (each worker writes its own key).
+    """
+    key = f"{json_file.parent.name}/{json_file.name}"
+    mtime_ns = json_file.stat().st_mtime_ns
+    record = old_index.get(key)
+    if not record or record.get("mtime_ns") != mtime_ns:
+        raw = json_file.read_bytes()
+        data = _loads(raw)
+        if not isinstance(data, dict):
+            raise ValueError("chapter JSON is not an object")
+        record = {"mtime_ns": mtime_ns}
+        if "chapterTitle" in data:
+            record["chapterTitle"] = data["chapterTitle"]
+    new_index[key] = record
+    return record
+
+# ============================================================================
+# HELPER FUNCTION: Build a chapter entry from its JSON file
+# ============================================================================
+
+def build_chapter_info(chapter_number, json_file, folder_url, old_index, new_index):
+    """Return (manifest entry, None) for one chapter JSON, or (None, warning) if unreadable."""
+    try:
+        record = read_chapter_record(json_file, old_index, new_index)
+        
+        # Check if corresponding PDF exists
+        pdf_path = json_file.with_suffix('.pdf')
+        has_metadata = True  # JSON exists
+        
+        # Construct GCS URLs
+        metadata_url = f"{folder_url}/{json_file.name}"
+        pdf_url = f"{folder_url}/{pdf_path.name}"
+        
+        return {
+            "chapterId": str(chapter_number),
+            "chapterNumber": chapter_number,
+            "title": record.get("chapterTitle", json_file.stem.replace("_", " ")),
+            "titleEnglish": record.get("chapterTitle", "").split(".")[-1].strip() if record.get("chapterTitle") else "",
+            "metadataUrl": metadata_url,
+            "pdfUrl": pdf_url,
+            "hasMetadata": has_metadata
+        }, None
+        
+    except Exception as e:
+        return None, f"   ⚠️ Warning: Could not process {json_file.name}. Error: {e}"
+
+# ============================================================================
+# SCRIPTURE LAYOUT
+# ============================================================================
+
+def find_book_folders(root_path):
+    """
+    Book folders in your actual Arthashastra folder structure:
         Arthashastra_Book_1_Concerning_Discipline/
             Arthashastra_Book_1_Concerning_Discipline_Chapter_1.pdf
             Arthashastra_Book_1_Concerning_Discipline_Chapter_1.json
@@ -81,238 +137,109 @@ def generate_chapter_manifest(scripture_root, scripture_id, scripture_name):
         Arthashastra_Book_2_The_Duties_of_Government_Suprintendents/
             ...
     """
-    
-    print("=" * 80)
-    print("CHAPTER MANIFEST GENERATOR - ARTHASHASTRA")
-    print("=" * 80)
-    print(f"Scripture: {scripture_name}")
-    print(f"Root Directory: {scripture_root}")
-    print(f"GCS Bucket: {GCS_BUCKET}")
-    print(f"GCS Path: {GCS_BASE_PATH}")
-    print("=" * 80)
-    
-    manifest = {
-        "scriptureId": scripture_id,
-        "scriptureName": scripture_name,
-        "totalChapters": 0,
-        "lastUpdated": datetime.now().strftime("%Y-%m-%dT%H:%M:%S") + "Z",
-        "sections": []
-    }
-    
-    root_path = Path(scripture_root)
-    
-    if not root_path.exists():
-        print(f"❌ Error: Directory does not exist: {scripture_root}")
-        return None
-    
-    # Find all Book folders
-    print("\n🔎 Scanning for Book folders...")
-    book_folders = [
-        d for d in root_path.iterdir() 
-        if d.is_dir() and d.name.startswith("Arthashastra_Book_")
-    ]
-    
-    if not book_folders:
-        print(f"❌ Error: No Book folders found in {scripture_root}")
-        return None
-    
-    print(f"✅ Found {len(book_folders)} Book folder(s)")
-    
-    # Process each Book folder
-    for book_folder in book_folders:
-        folder_name = book_folder.name
-        print(f"\n📂 Processing: {folder_name}")
-        
-        # Extract book info
-        book_id, book_name, book_name_english = extract_book_info(folder_name)
-        
-        print(f"   Book ID: {book_id}")
-        print(f"   Book Name: {book_name}")
-        print(f"   English: {book_name_english}")
-        
-        chapters = []
-        
-        # Find all JSON files in this Book folder
-        json_files = sorted(
-            [p for p in book_folder.glob("*.json") if "manifest" not in p.name.lower()],
-            key=lambda p: get_chapter_number(p.name)
+    with os.scandir(root_path) as entries:
+        return sorted(
+            Path(entry.path) for entry in entries
+            if entry.name.startswith("Arthashastra_Book_") and entry.is_dir()
         )
-        
-        if not json_files:
-            print(f"   ⚠️ No JSON files found in {folder_name}")
-            continue
-        
-        print(f"   Found {len(json_files)} JSON file(s)")
-        
-        for json_file in json_files:
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                chapter_number = get_chapter_number(json_file.name)
-                
-                # Check if corresponding PDF exists
-                pdf_path = json_file.with_suffix('.pdf')
-                has_metadata = True  # JSON exists
-                
-                # Construct GCS URLs
-                metadata_url = f"{GCS_BUCKET}/{GCS_BASE_PATH}/{folder_name}/{json_file.name}"
-                pdf_url = f"{GCS_BUCKET}/{GCS_BASE_PATH}/{folder_name}/{pdf_path.name}"
-                
-                chapter_info = {
-                    "chapterId": str(chapter_number),
-                    "chapterNumber": chapter_number,
-                    "title": data.get("chapterTitle", json_file.stem.replace("_", " ")),
-                    "titleEnglish": data.get("chapterTitle", "").split(".")[-1].strip() if data.get("chapterTitle") else "",
-                    "metadataUrl": metadata_url,
-                    "pdfUrl": pdf_url,
-                    "hasMetadata": has_metadata
-                }
-                chapters.append(chapter_info)
-                manifest["totalChapters"] += 1
-                
-            except Exception as e:
-                print(f"   ⚠️ Warning: Could not process {json_file.name}. Error: {e}")
-                continue
-        
-        # Sort chapters by chapter number
-        chapters.sort(key=lambda x: x["chapterNumber"])
-        
-        # Create section entry (Book = Section)
-        section_entry = {
-            "sectionId": book_id,
-            "sectionName": book_name,
-            "sectionNameEnglish": book_name_english,
-            "chapterCount": len(chapters),
-            "chapters": chapters
-        }
-        
-        manifest["sections"].append(section_entry)
-        print(f"   ✅ Processed {len(chapters)} chapter(s)")
-    
-    # Sort sections by Book ID (numeric)
-    try:
-        manifest["sections"].sort(key=lambda x: int(x["sectionId"]))
-    except:
-        pass  # If section IDs are not numeric, keep original order
-    
-    return manifest
 
-# ============================================================================
-# VALIDATION FUNCTION
-# ============================================================================
+def load_index(ctx):
+    ctx.state = (load_title_index(ctx.root_path), {})
 
-def validate_manifest(manifest):
-    """Validate the generated manifest for completeness."""
-    
-    print("\n" + "=" * 80)
-    print("VALIDATING MANIFEST")
-    print("=" * 80)
-    
-    if not manifest:
-        print("❌ Manifest is empty or None")
-        return False
-    
-    # Check required fields
-    required_fields = ["scriptureId", "scriptureName", "totalChapters", "sections"]
-    for field in required_fields:
-        if field not in manifest:
-            print(f"❌ Missing required field: {field}")
-            return False
-    
-    if len(manifest["sections"]) == 0:
-        print("❌ No sections found in manifest")
-        return False
-    
-    print(f"✅ Scripture ID: {manifest['scriptureId']}")
-    print(f"✅ Scripture Name: {manifest['scriptureName']}")
-    print(f"✅ Total Chapters: {manifest['totalChapters']}")
-    print(f"✅ Total Sections: {len(manifest['sections'])}")
-    
-    # Validate each section
-    chapters_with_metadata = 0
-    chapters_without_metadata = 0
-    
-    for section in manifest["sections"]:
-        print(f"\n   Book {section['sectionId']}: {section['sectionName']}")
-        print(f"      Chapters: {section['chapterCount']}")
-        
-        for chapter in section["chapters"]:
-            if chapter.get("hasMetadata", False):
-                chapters_with_metadata += 1
-            else:
-                chapters_without_metadata += 1
-    
-    print(f"\n✅ Chapters with JSON metadata: {chapters_with_metadata}")
-    if chapters_without_metadata > 0:
-        print(f"⚠️ Chapters without JSON metadata: {chapters_without_metadata}")
-    
-    print("\n✅ Manifest validation passed!")
-    return True
+def save_index(ctx):
+    old_index, new_index = ctx.state
+    if new_index != old_index:
+        save_title_index(ctx.root_path, new_index)
+
+def process_book(book_folder, ctx):
+    """Return (section entry or None, log lines) for one Book folder."""
+    old_index, new_index = ctx.state
+    folder_name = book_folder.name
+    log = [f"\n📂 Processing: {folder_name}"]
+    
+    # Extract book info
+    book_id, book_name, book_name_english = extract_book_info(folder_name)
+    
+    log.append(f"   Book ID: {book_id}")
+    log.append(f"   Book Name: {book_name}")
+    log.append(f"   English: {book_name_english}")
+    
+    # Find all JSON files in this Book folder from one directory listing,
+    # parsing each chapter number once
+    with os.scandir(book_folder) as entries:
+        json_names = [
+            entry.name for entry in entries
+            if entry.name.endswith(".json") and "manifest" not in entry.name.lower()
+        ]
+    numbered_files = sorted(
+        [(get_chapter_number(name), book_folder / name) for name in json_names],
+        key=lambda item: item[0]
+    )
+    chapter_numbers = [number for number, _ in numbered_files]
+    json_files = [p for _, p in numbered_files]
+    
+    if not json_files:
+        log.append(f"   ⚠️ No JSON files found in {folder_name}")
+        return None, log
+    
+    log.append(f"   Found {len(json_files)} JSON file(s)")
+    
+    folder_url = f"{ctx.config.gcs_root_url}/{folder_name}"
+    
+    # Read and parse the chapter JSON files in parallel (map keeps input order)
+    chapters = []
+    for chapter_info, warning in ctx.pool.map(
+        build_chapter_info, chapter_numbers, json_files,
+        [folder_url] * len(json_files), [old_index] * len(json_files), [new_index] * len(json_files)
+    ):
+        if warning:
+            log.append(warning)
+        if chapter_info is not None:
+            chapters.append(chapter_info)
+    
+    # Sort chapters by chapter number
+    chapters.sort(key=lambda x: x["chapterNumber"])
+    
+    log.append(f"   ✅ Processed {len(chapters)} chapter(s)")
+    
+    # Create section entry (Book = Section)
+    return {
+        "sectionId": book_id,
+        "sectionName": book_name,
+        "sectionNameEnglish": book_name_english,
+        "chapterCount": len(chapters),
+        "chapters": chapters
+    }, log
+
+CONFIG = ScriptureConfig(
+    scripture_id=SCRIPTURE_ID,
+    scripture_name=SCRIPTURE_NAME,
+    root=Path(ROOT_DIRECTORY),
+    gcs_base_path=GCS_BASE_PATH,
+    display_name="ARTHASHASTRA",
+    section_label="Book",
+    find_sections=find_book_folders,
+    process_section=process_book,
+    # Folders come back in name order; sections are put in numeric order
+    sort_sections=True,
+    output_path=Path(ROOT_DIRECTORY) / f"{SCRIPTURE_ID}_chapter_manifest.json",
+    on_start=load_index,
+    on_finish=save_index,
+    next_steps=(
+        "   1. Review the generated JSON file",
+        "   2. Upload to GCS:",
+        f"      a) Navigate to: {GCS_BUCKET}/Gurukul_Library/Primary_Texts/Sastras/",
+        "      b) Upload your entire ArthaShastra folder (with all Book subfolders)",
+        "      c) Upload this manifest JSON to the appropriate location",
+        "   3. Verify permissions (allUsers = Storage Object Viewer)",
+        "   4. Test access with curl",
+        "   5. Ready for frontend display!",
+    ),
+)
 
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
-def main():
-    """Main function to generate the chapter manifest."""
-    print("\n")
-    print("╔════════════════════════════════════════════════════════════╗")
-    print("║                                                            ║")
-    print("║       MYGURUKUL CHAPTER MANIFEST GENERATOR - ARTHASHASTRA  ║")
-    print("║                                                            ║")
-    print("╚════════════════════════════════════════════════════════════╝")
-    print("\n")
-    
-    try:
-        # Generate manifest
-        manifest = generate_chapter_manifest(
-            scripture_root=ROOT_DIRECTORY,
-            scripture_id=SCRIPTURE_ID,
-            scripture_name=SCRIPTURE_NAME
-        )
-        
-        if manifest is None:
-            print("\n❌ Failed to generate manifest")
-            exit(1)
-        
-        # Validate manifest
-        if not validate_manifest(manifest):
-            print("\n❌ Manifest validation failed")
-            exit(1)
-        
-        # Save manifest
-        output_filename = f"{SCRIPTURE_ID}_chapter_manifest.json"
-        output_path = Path(ROOT_DIRECTORY) / output_filename
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
-        
-        print("\n" + "=" * 80)
-        print("SUCCESS!")
-        print("=" * 80)
-        print(f"✅ Generated: {output_path}")
-        print(f"📊 Total Chapters: {manifest['totalChapters']}")
-        print(f"📚 Total Sections (Books): {len(manifest['sections'])}")
-        print("=" * 80)
-        
-        print("\n📋 NEXT STEPS:")
-        print("   1. Review the generated JSON file")
-        print("   2. Upload to GCS:")
-        print(f"      a) Navigate to: {GCS_BUCKET}/Gurukul_Library/Primary_Texts/Sastras/")
-        print(f"      b) Upload your entire ArthaShastra folder (with all Book subfolders)")
-        print(f"      c) Upload this manifest JSON to the appropriate location")
-        print("   3. Verify permissions (allUsers = Storage Object Viewer)")
-        print("   4. Test access with curl")
-        print("   5. Ready for frontend display!")
-        print("\n")
-        
-    except Exception as e:
-        print(f"\n❌ Fatal Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        exit(1)
-
 if __name__ == "__main__":
-    main()
-
+    run(CONFIG)
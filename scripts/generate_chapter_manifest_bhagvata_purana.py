@@ -1,9 +1,10 @@
-import json
+import os
 import re
-import time
-from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 
+from manifest_core import ScanContext, ScriptureConfig, _loads, list_pdfs, read_json_bytes, run
+
 
 # ============================================================================
 # CONFIGURATION
@@ -12,9 +13,16 @@ from pathlib import Path
 ROOT_DIRECTORY = "/Users/AJ/Desktop/mygurukul-app/Gurukul_Library/Primary_Texts/Puranas/Bhagvata_Purana"
 SCRIPTURE_ID = "Bhagvata_Purana"  # Matches library manifest ID format
 SCRIPTURE_NAME = "Bhagavata Purana"
-GCS_BUCKET = "gs://mygurukul-sacred-texts-corpus"
 GCS_BASE_PATH = "Gurukul_Library/Primary_Texts/Puranas/Bhagvata_Purana"
 
+# Filename patterns, compiled once; the helpers below run for every chapter
+_CANTO_RE = re.compile(r"Canto_(\d+)_Srimad_Bhagvatam_(.+)")
+_CHAPTER_UNDERSCORE_RE = re.compile(r"SB_(\d+)_(\d+)_")
+_CHAPTER_DOTTED_RE = re.compile(r"SB\s+(\d+)\.(\d+)[\s-]")
+_SB_NUMBER_PREFIX_RE = re.compile(r"^SB[_\s]*\d+[._]\d+[_\s-]*", re.IGNORECASE)
+_SB_PREFIX_RE = re.compile(r"^SB[_\s]*", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 # ============================================================================
 # HELPERS
@@ -27,7 +35,7 @@ def extract_canto_info(folder_name: str) -> tuple:
     Example: "Canto_1_Srimad_Bhagvatam_Creation" -> (1, "Creation")
     Example: "Canto_10_Srimad_Bhagvatam_Summum_Bonum" -> (10, "Summum Bonum")
     """
-    match = re.search(r"Canto_(\d+)_Srimad_Bhagvatam_(.+)", folder_name)
+    match = _CANTO_RE.search(folder_name)
     if match:
         try:
             canto_num = int(match.group(1))
@@ -46,7 +54,7 @@ def extract_chapter_info(filename: str) -> tuple:
     2. "SB 10.1- The Advent of Lord Kṛṣṇa- Introduction.pdf" -> (10, 1)
     """
     # Format 1: SB_X_Y_Title.pdf
-    match = re.search(r"SB_(\d+)_(\d+)_", filename)
+    match = _CHAPTER_UNDERSCORE_RE.search(filename)
     if match:
         try:
             canto_num = int(match.group(1))
@@ -56,7 +64,7 @@ def extract_chapter_info(filename: str) -> tuple:
             pass
     
     # Format 2: SB X.Y- Title.pdf
-    match = re.search(r"SB\s+(\d+)\.(\d+)[\s-]", filename)
+    match = _CHAPTER_DOTTED_RE.search(filename)
     if match:
         try:
             canto_num = int(match.group(1))
@@ -74,14 +82,14 @@ def derive_fallback_title(filename: str) -> str:
     cleaned = Path(filename).stem
     
     # Remove SB prefix and numbers
-    cleaned = re.sub(r"^SB[_\s]*\d+[._]\d+[_\s-]*", "", cleaned, flags=re.IGNORECASE)
-    cleaned = re.sub(r"^SB[_\s]*", "", cleaned, flags=re.IGNORECASE)
+    cleaned = _SB_NUMBER_PREFIX_RE.sub("", cleaned)
+    cleaned = _SB_PREFIX_RE.sub("", cleaned)
     
     # Replace underscores/hyphens with spaces
     cleaned = cleaned.replace("_", " ").replace("-", " ")
     
     # Clean up multiple spaces
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    cleaned = _WHITESPACE_RE.sub(" ", cleaned).strip()
     
     return cleaned.title() if cleaned else "Bhagavata Purana Chapter"
 
@@ -91,201 +99,147 @@ def derive_fallback_title(filename: str) -> str:
 # ============================================================================
 
 
-def generate_chapter_manifest(root_directory: str):
-    print("=" * 80)
-    print("CHAPTER MANIFEST GENERATOR - BHAGAVATA PURANA")
-    print("=" * 80)
-    print(f"Scripture: {SCRIPTURE_NAME}")
-    print(f"Root Directory: {root_directory}")
-    print(f"GCS Bucket: {GCS_BUCKET}")
-    print(f"GCS Base Path: {GCS_BASE_PATH}")
-    print("=" * 80)
-
-    root_path = Path(root_directory)
-    if not root_path.exists():
-        print(f"❌ Error: Directory does not exist: {root_directory}")
-        return None
-
-    # Find all Canto folders (sections)
-    print("\n🔎 Scanning for Canto folders...")
-    canto_folders = sorted(
-        [
-            d
-            for d in root_path.iterdir()
-            if d.is_dir() and d.name.startswith("Canto_")
-        ],
-        key=lambda d: extract_canto_info(d.name)[0] or 999,
-    )
-
-    if not canto_folders:
-        print(f"❌ Error: No Canto folders found in {root_directory}")
-        return None
-
-    print(f"✅ Found {len(canto_folders)} Canto folder(s)")
-
-    manifest = {
-        "scriptureId": SCRIPTURE_ID,
-        "scriptureName": SCRIPTURE_NAME,
-        "totalChapters": 0,
-        "lastUpdated": datetime.now().strftime("%Y-%m-%dT%H:%M:%S") + "Z",
-        "sections": [],
-    }
-
-    # Process each Canto (section)
-    for canto_folder in canto_folders:
-        canto_num, canto_desc = extract_canto_info(canto_folder.name)
-        if canto_num is None:
-            print(f"\n⚠️ Skipping {canto_folder.name} - could not extract Canto info")
-            continue
-
-        print(f"\n📂 Processing Canto {canto_num}: {canto_desc}")
+def find_canto_folders(root_path: Path) -> list:
+    """Return ((canto_num, canto_desc), canto_folder) for every Canto folder, in Canto order."""
+    # Parse each folder name once; the (canto_num, canto_desc) pair is reused
+    # as the sort key and handed to the worker. DirEntry.is_dir() is answered from
+    # the directory listing itself, unlike Path.is_dir() which stats each entry.
+    with os.scandir(root_path) as entries:
+        canto_folders = [
+            (extract_canto_info(entry.name), Path(entry.path))
+            for entry in entries
+            if entry.name.startswith("Canto_") and entry.is_dir()
+        ]
+    canto_folders.sort(key=lambda item: item[0][0] or 999)
+    return canto_folders
 
-        # Find all PDF files in this Canto
-        pdf_files = sorted(canto_folder.glob("*.pdf"))
 
-        if not pdf_files:
-            print(f"  ⚠️ No PDF files found in {canto_folder.name}")
+def process_canto(canto_item: tuple, ctx: ScanContext) -> tuple:
+    """
+    Build the section entry for one ((canto_num, canto_desc), canto_folder) item.
+    Returns (section_entry or None, log lines); the caller prints the lines so
+    output from parallel workers never interleaves.
+    """
+    log = []
+    (canto_num, canto_desc), canto_folder = canto_item
+    if canto_num is None:
+        log.append(f"\n⚠️ Skipping {canto_folder.name} - could not extract Canto info")
+        return None, log
+
+    log.append(f"\n📂 Processing Canto {canto_num}: {canto_desc}")
+
+    # List the Canto once; PDFs and their JSON siblings are looked up in it
+    # (plain names; Paths are built only for reads)
+    pdf_names, file_names = list_pdfs(canto_folder)
+
+    folder_name = canto_folder.name
+    url_prefix = f"{ctx.config.gcs_root_url}/{folder_name}/"
+
+    if not pdf_names:
+        log.append(f"  ⚠️ No PDF files found in {folder_name}")
+        return None, log
+
+    log.append(f"  Found {len(pdf_names)} PDF file(s)")
+
+    # Extract canto and chapter numbers from each filename, then read every
+    # metadata JSON in one batch on the shared chapter pool
+    candidates = [
+        (pdf_filename, pdf_filename[:-4] + ".json", extract_chapter_info(pdf_filename))
+        for pdf_filename in pdf_names
+    ]
+    json_names = [
+        json_name
+        for _, json_name, (file_canto, chapter_num) in candidates
+        if file_canto is not None and chapter_num is not None and json_name in file_names
+    ]
+    json_paths = [canto_folder / json_name for json_name in json_names]
+    json_blobs = dict(zip(json_names, ctx.pool.map(read_json_bytes, json_paths)))
+
+    chapter_rows = []
+    missing_metadata = 0  # reported once per Canto rather than per chapter
+
+    for pdf_filename, json_name, (file_canto, chapter_num) in candidates:
+        # Verify canto matches folder
+        if file_canto is None or chapter_num is None:
+            log.append(f"    ⚠️ Could not extract chapter info from: {pdf_filename}")
             continue
-
-        print(f"  Found {len(pdf_files)} PDF file(s)")
-
-        chapters = []
-
-        for pdf_path in pdf_files:
-            pdf_filename = pdf_path.name
-            
-            # Extract canto and chapter numbers from filename
-            file_canto, chapter_num = extract_chapter_info(pdf_filename)
-            
-            # Verify canto matches folder
-            if file_canto is None or chapter_num is None:
-                print(f"    ⚠️ Could not extract chapter info from: {pdf_filename}")
-                continue
-            
-            if file_canto != canto_num:
-                print(f"    ⚠️ Canto mismatch: file says {file_canto}, folder says {canto_num} - {pdf_filename}")
-                # Use folder canto number
-                file_canto = canto_num
-
-            # Check if corresponding JSON exists
-            json_path = pdf_path.with_suffix(".json")
-            has_metadata = json_path.exists()
-
-            if not has_metadata:
-                print(f"    ⚠️ Metadata JSON missing for: {pdf_filename}")
-
-            # Get title from JSON if available, otherwise use fallback
+        
+        if file_canto != canto_num:
+            log.append(f"    ⚠️ Canto mismatch: file says {file_canto}, folder says {canto_num} - {pdf_filename}")
+            # Use folder canto number
+            file_canto = canto_num
+
+        # Check if corresponding JSON exists
+        has_metadata = json_name in file_names
+
+        if not has_metadata:
+            missing_metadata += 1
+
+        # Get title from JSON if available, otherwise use fallback
+        title = None
+        if has_metadata:
+            raw = json_blobs[json_name]
+            try:
+                if isinstance(raw, OSError):
+                    raise raw
+                data = _loads(raw)
+                if not isinstance(data, dict):
+                    raise ValueError("metadata JSON is not an object")
+            except (OSError, ValueError) as exc:
+                log.append(f"    ⚠️ Could not read metadata JSON: {exc}")
+                has_metadata = False
+            else:
+                title = data.get("chapterTitle")
+        if not title:
             title = derive_fallback_title(pdf_filename)
-            if has_metadata:
-                try:
-                    with open(json_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    title = data.get("chapterTitle", title)
-                except Exception as exc:
-                    print(f"    ⚠️ Could not read metadata JSON: {exc}")
-                    has_metadata = False
-
-            # Construct GCS URLs
-            metadata_url = (
-                f"{GCS_BUCKET}/{GCS_BASE_PATH}/{canto_folder.name}/{json_path.name}"
-                if has_metadata
-                else ""
-            )
-            pdf_url = f"{GCS_BUCKET}/{GCS_BASE_PATH}/{canto_folder.name}/{pdf_path.name}"
-
-            chapter_entry = {
-                "chapterId": str(chapter_num),
-                "chapterNumber": chapter_num,
-                "title": title,
-                "titleEnglish": title,  # Same as title for chapters
-                "metadataUrl": metadata_url,
-                "pdfUrl": pdf_url,
-                "hasMetadata": has_metadata,
-            }
-
-            chapters.append(chapter_entry)
-            manifest["totalChapters"] += 1
-            time.sleep(0.01)  # Small delay to avoid overwhelming system
-
-        # Sort chapters by chapter number
-        chapters.sort(key=lambda c: c["chapterNumber"])
-
-        # Create section entry (Canto = Section)
-        section_entry = {
-            "sectionId": str(canto_num),
-            "sectionName": f"Canto {canto_num}: {canto_desc}",
-            "sectionNameEnglish": f"Canto {canto_num}: {canto_desc}",
-            "chapterCount": len(chapters),
-            "chapters": chapters,
-        }
-
-        manifest["sections"].append(section_entry)
-        print(f"  ✅ Processed {len(chapters)} chapter(s)")
-
-    # Sort sections by Canto number
-    manifest["sections"].sort(key=lambda x: int(x["sectionId"]))
-
-    if not manifest["sections"]:
-        print("❌ No sections were processed successfully")
-        return None
-
-    print(f"\n✅ Compiled {manifest['totalChapters']} total chapter(s) across {len(manifest['sections'])} Canto(s)")
-    return manifest
-
-
-# ============================================================================
-# VALIDATION
-# ============================================================================
-
 
-def validate_manifest(manifest):
-    print("\n" + "=" * 80)
-    print("VALIDATING MANIFEST")
-    print("=" * 80)
-
-    if not manifest:
-        print("❌ Manifest is empty or None")
-        return False
-
-    required_fields = ["scriptureId", "scriptureName", "totalChapters", "sections"]
-    for field in required_fields:
-        if field not in manifest:
-            print(f"❌ Missing required field: {field}")
-            return False
-
-    if len(manifest["sections"]) == 0:
-        print("❌ No sections found in manifest")
-        return False
-
-    print(f"✅ Scripture ID: {manifest['scriptureId']}")
-    print(f"✅ Scripture Name: {manifest['scriptureName']}")
-    print(f"✅ Total Chapters: {manifest['totalChapters']}")
-    print(f"✅ Total Sections (Cantos): {len(manifest['sections'])}")
-
-    # Validate each section
-    chapters_with_metadata = 0
-    chapters_without_metadata = 0
-
-    for section in manifest["sections"]:
-        print(f"\n   Canto {section['sectionId']}: {section['sectionName']}")
-        print(f"      Chapters: {section['chapterCount']}")
-
-        if section.get("chapterCount", 0) != len(section.get("chapters", [])):
-            print(f"      ❌ Chapter count mismatch")
-            return False
+        # Construct GCS URLs
+        metadata_url = url_prefix + json_name if has_metadata else ""
+        pdf_url = url_prefix + pdf_filename
+
+        chapter_rows.append((chapter_num, title, metadata_url, pdf_url, has_metadata))
+
+    # Sort the lightweight rows by chapter number, then build the entries in one pass
+    chapter_rows.sort(key=itemgetter(0))
+    chapters = [
+        {
+            "chapterId": str(chapter_num),
+            "chapterNumber": chapter_num,
+            "title": title,
+            "titleEnglish": title,  # Same as title for chapters
+            "metadataUrl": metadata_url,
+            "pdfUrl": pdf_url,
+            "hasMetadata": has_metadata,
+        }
+        for chapter_num, title, metadata_url, pdf_url, has_metadata in chapter_rows
+    ]
+
+    # Create section entry (Canto = Section)
+    section_entry = {
+        "sectionId": str(canto_num),
+        "sectionName": f"Canto {canto_num}: {canto_desc}",
+        "sectionNameEnglish": f"Canto {canto_num}: {canto_desc}",
+        "chapterCount": len(chapters),
+        "chapters": chapters,
+    }
 
-        for chapter in section["chapters"]:
-            if chapter.get("hasMetadata", False):
-                chapters_with_metadata += 1
-            else:
-                chapters_without_metadata += 1
+    if missing_metadata:
+        log.append(f"    ⚠️ Metadata JSON missing for {missing_metadata} chapter(s)")
+    log.append(f"  ✅ Processed {len(chapters)} chapter(s)")
+    return section_entry, log
 
-    print(f"\n✅ Chapters with JSON metadata: {chapters_with_metadata}")
-    if chapters_without_metadata > 0:
-        print(f"⚠️ Chapters without JSON metadata: {chapters_without_metadata}")
 
-    print("\n✅ Manifest validation passed!")
-    return True
+CONFIG = ScriptureConfig(
+    scripture_id=SCRIPTURE_ID,
+    scripture_name=SCRIPTURE_NAME,
+    root=Path(ROOT_DIRECTORY),
+    gcs_base_path=GCS_BASE_PATH,
+    display_name="BHAGAVATA PURANA",
+    section_label="Canto",
+    find_sections=find_canto_folders,
+    process_section=process_canto,
+    output_path=Path(ROOT_DIRECTORY) / f"{SCRIPTURE_ID}_chapter_manifest.json",
+)
 
 
 # ============================================================================
@@ -293,44 +247,5 @@ def validate_manifest(manifest):
 # ============================================================================
 
 
-def main():
-    print("\n")
-    print("╔══════════════════════════════════════════════════════════╗")
-    print("║                                                          ║")
-    print("║  MYGURUKUL CHAPTER MANIFEST GENERATOR - BHAGAVATA PURANA  ║")
-    print("║                                                          ║")
-    print("╚══════════════════════════════════════════════════════════╝")
-    print("\n")
-
-    try:
-        manifest = generate_chapter_manifest(ROOT_DIRECTORY)
-        if manifest is None:
-            print("\n❌ Failed to generate manifest")
-            return
-
-        if not validate_manifest(manifest):
-            print("\n❌ Manifest validation failed")
-            return
-
-        output_filename = f"{SCRIPTURE_ID}_chapter_manifest.json"
-        output_path = Path(ROOT_DIRECTORY) / output_filename
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
-
-        print("\n" + "=" * 80)
-        print("SUCCESS!")
-        print("=" * 80)
-        print(f"✅ Generated: {output_path}")
-        print(f"📊 Total Chapters: {manifest['totalChapters']}")
-        print(f"📚 Total Sections (Cantos): {len(manifest['sections'])}")
-        print("=" * 80)
-
-    except Exception as exc:
-        print(f"\n❌ Fatal Error: {exc}")
-        raise
-
-
 if __name__ == "__main__":
-    main()
-
+    run(CONFIG)
@@ -1,9 +1,20 @@
 import os
-import json
 from pathlib import Path
-from datetime import datetime
 import re
 
+from manifest_core import (
+    GCS_BUCKET,
+    ScanContext,
+    ScriptureConfig,
+    finish_section_cache,
+    folder_fingerprint,
+    read_chapter_title,
+    read_files,
+    run,
+    start_section_cache,
+    walk_tree,
+)
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -12,9 +23,16 @@ import re
 ROOT_DIRECTORY = "/Users/AJ/Desktop/mygurukul-app/Gurukul_Library/Primary_Texts/Sastras/KamaSutra"
 SCRIPTURE_ID = "kamasutra"
 SCRIPTURE_NAME = "Kama Sutra"
-GCS_BUCKET = "gs://mygurukul-sacred-texts-corpus"
 GCS_BASE_PATH = "Gurukul_Library/Primary_Texts/Sastras/KamaSutra"
 
+# Every chapter URL starts with this prefix
+GCS_ROOT_URL = f"{GCS_BUCKET}/{GCS_BASE_PATH}"
+
+# Folder / filename patterns, compiled once
+_PART_RE = re.compile(r'Part_(\d+)_(.*)')
+_PART_NUMBER_RE = re.compile(r'Part_(\d+)')
+_CHAPTER_RE = re.compile(r'_Chapter_(\d+)')
+
 # ============================================================================
 # HELPER FUNCTION: Extract Part info from folder name
 # ============================================================================
@@ -27,7 +45,7 @@ def extract_part_info(folder_name):
     Returns: (part_id, part_name, part_name_english)
     """
     # Pattern: Part_1_General_Considerations
-    match = re.match(r'Part_(\d+)_(.*)', folder_name)
+    match = _PART_RE.match(folder_name)
     if match:
         part_id = match.group(1)  # "1", "2", etc.
         part_name = match.group(2) # "General_Considerations"
@@ -46,7 +64,7 @@ def extract_part_info(folder_name):
 def get_chapter_number(filename):
     """Extracts the chapter number from the filename using a regular expression."""
     # Handle patterns like: _Chapter_1.json
-    match = re.search(r'_Chapter_(\d+)', filename)
+    match = _CHAPTER_RE.search(filename)
     if match:
         return int(match.group(1))
     return 0  # Default if no number is found
@@ -55,203 +73,140 @@ def get_chapter_number(filename):
 # MANIFEST GENERATION
 # ============================================================================
 
-def generate_chapter_manifest(scripture_root, scripture_id, scripture_name):
+def find_part_folders(root_path):
     """
-    Scans your Kama Sutra folder structure and generates the manifest.
-    Handles folder structure like:
+    Return ((part_id, part_name, part_name_english), part_folder, file_names) for
+    every Part folder, in Part order. Handles folder structure like:
     Part_1_General_Considerations/
         Part_1_General_Considerations_Chapter_1.pdf
         Part_1_General_Considerations_Chapter_1.json
     ...
     """
-    print("=" * 80)
-    print("CHAPTER MANIFEST GENERATOR - KAMA SUTRA")
-    print("=" * 80)
-    print(f"Scripture: {scripture_name}")
-    print(f"Root Directory: {scripture_root}")
-    print(f"GCS Bucket: {GCS_BUCKET}")
-    print(f"GCS Path: {GCS_BASE_PATH}")
-    print("=" * 80)
-
-    manifest = {
-        "scriptureId": scripture_id,
-        "scriptureName": scripture_name,
-        "totalChapters": 0,
-        "lastUpdated": datetime.now().strftime("%Y-%m-%dT%H:%M:%S") + "Z",
-        "sections": []
-    }
-
-    root_path = Path(scripture_root)
-    if not root_path.exists():
-        print(f"❌ Error: Directory does not exist: {scripture_root}")
-        return None
-
-    print("\n🔎 Scanning for Part folders...")
+    # One os.walk over the root and the Part folders; everything below is in-memory
+    tree = walk_tree(root_path, max_depth=1)
+    root_dirs, _ = tree[Path(".")]
+    # Parse each folder name once; the info is handed to process_part with the folder
     part_folders = sorted(
-        [d for d in root_path.iterdir() if d.is_dir() and d.name.startswith("Part_")],
-        key=lambda d: int(re.match(r'Part_(\d+)', d.name).group(1))
+        [
+            (int(_PART_NUMBER_RE.match(name).group(1)), extract_part_info(name), root_path / name)
+            for name in root_dirs if name.startswith("Part_")
+        ],
+        key=lambda item: item[0]
     )
+    return [
+        (part_info, part_folder, tree[Path(part_folder.name)][1])
+        for _, part_info, part_folder in part_folders
+    ]
 
-    if not part_folders:
-        print(f"❌ Error: No Part folders found in {scripture_root}")
-        return None
-
-    print(f"✅ Found {len(part_folders)} Part folder(s)")
-
-    for part_folder in part_folders:
-        folder_name = part_folder.name
-        print(f"\n📂 Processing: {folder_name}")
-
-        part_id, part_name, part_name_english = extract_part_info(folder_name)
-        print(f"  Part ID: {part_id}")
-        print(f"  Part Name: {part_name}")
-        print(f"  English: {part_name_english}")
-
-        chapters = []
-        json_files = sorted(
-            [p for p in part_folder.glob("*.json") if "manifest" not in p.name.lower()],
-            key=lambda p: get_chapter_number(p.name)
-        )
+def process_part(part_item, ctx: ScanContext):
+    """
+    Build the section entry for one ((part_id, part_name, part_name_english),
+    part_folder, file_names) item. Returns (section_entry or None, log lines).
 
-        if not json_files:
-            print(f"  ⚠️ No JSON files found in {folder_name}")
+    A Part whose folder fingerprint matches the previous run's section cache reuses
+    its cached entry. Every built or reused entry is recorded in the new cache.
+    """
+    (part_id, part_name, part_name_english), part_folder, file_names = part_item
+    old_cache, new_cache = ctx.state
+    folder_name = part_folder.name
+    log = [f"\n📂 Processing: {folder_name}"]
+
+    log.append(f"  Part ID: {part_id}")
+    log.append(f"  Part Name: {part_name}")
+    log.append(f"  English: {part_name_english}")
+
+    fingerprint = folder_fingerprint(part_folder, salt=GCS_ROOT_URL)
+    cached = old_cache.get(folder_name)
+    if cached and cached.get("fingerprint") == fingerprint:
+        new_cache[folder_name] = cached
+        log.append(f"  ♻️ Unchanged since last run; reusing {cached['section']['chapterCount']} chapter(s)")
+        return cached["section"], log
+
+    chapters = []
+    # Parse each chapter number once; it is both the sort key and the chapter ID
+    numbered_files = sorted(
+        [
+            (get_chapter_number(name), part_folder / name)
+            for name in file_names if name.endswith(".json") and "manifest" not in name.lower()
+        ],
+        key=lambda item: item[0]
+    )
+    json_files = [json_file for _, json_file in numbered_files]
+
+    if not json_files:
+        log.append(f"  ⚠️ No JSON files found in {folder_name}")
+        return None, log
+
+    log.append(f"  Found {len(json_files)} JSON file(s)")
+
+    # Read the Part's chapter JSON in one batch on the shared chapter pool
+    json_blobs = read_files(json_files, ctx.pool)
+
+    folder_prefix = f"{GCS_ROOT_URL}/{folder_name}/"
+
+    for chapter_number, json_file in numbered_files:
+        try:
+            raw = json_blobs[json_file]
+            if isinstance(raw, OSError):
+                raise raw
+            title = read_chapter_title(raw, json_file.stem.replace("_", " "))
+            
+            # Corresponding PDF (the name ends in ".json", so no Path is needed)
+            pdf_name = json_file.name[:-5] + ".pdf"
+            
+            # Construct GCS URLs
+            metadata_url = folder_prefix + json_file.name
+            pdf_url = folder_prefix + pdf_name
+
+            chapter_info = {
+                "chapterId": str(chapter_number),
+                "chapterNumber": chapter_number,
+                "title": title,
+                "metadataUrl": metadata_url,
+                "pdfUrl": pdf_url,
+                "hasMetadata": True
+            }
+            chapters.append(chapter_info)
+        except Exception as e:
+            log.append(f"  ⚠️ Warning: Could not process {json_file.name}. Error: {e}")
             continue
-
-        print(f"  Found {len(json_files)} JSON file(s)")
-
-        for json_file in json_files:
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                chapter_number = get_chapter_number(json_file.name)
-                
-                # Check for corresponding PDF
-                pdf_path = json_file.with_suffix('.pdf')
-                
-                # Construct GCS URLs
-                metadata_url = f"{GCS_BUCKET}/{GCS_BASE_PATH}/{folder_name}/{json_file.name}"
-                pdf_url = f"{GCS_BUCKET}/{GCS_BASE_PATH}/{folder_name}/{pdf_path.name}"
-
-                chapter_info = {
-                    "chapterId": str(chapter_number),
-                    "chapterNumber": chapter_number,
-                    "title": data.get("chapterTitle", json_file.stem.replace("_", " ")),
-                    "metadataUrl": metadata_url,
-                    "pdfUrl": pdf_url,
-                    "hasMetadata": True
-                }
-                chapters.append(chapter_info)
-                manifest["totalChapters"] += 1
-            except Exception as e:
-                print(f"  ⚠️ Warning: Could not process {json_file.name}. Error: {e}")
-                continue
-        
-        # Sort chapters by chapter number
-        chapters.sort(key=lambda x: x["chapterNumber"])
-
-        section_entry = {
-            "sectionId": part_id,
-            "sectionName": f"Part {part_id}: {part_name_english}",
-            "sectionNameEnglish": part_name_english,
-            "chapterCount": len(chapters),
-            "chapters": chapters
-        }
-        manifest["sections"].append(section_entry)
-        print(f"  ✅ Processed {len(chapters)} chapter(s)")
-
-    return manifest
-
-# ============================================================================
-# VALIDATION FUNCTION
-# ============================================================================
-
-def validate_manifest(manifest):
-    # This function remains largely the same as the Arthashastra template
-    # and is robust enough to validate the new structure.
-    print("\n" + "=" * 80)
-    print("VALIDATING MANIFEST")
-    print("=" * 80)
-    if not manifest:
-        print("❌ Manifest is empty or None")
-        return False
-
-    required_fields = ["scriptureId", "scriptureName", "totalChapters", "sections"]
-    for field in required_fields:
-        if field not in manifest:
-            print(f"❌ Missing required field: {field}")
-            return False
-
-    if len(manifest["sections"]) == 0:
-        print("❌ No sections found in manifest")
-        return False
     
-    print(f"✅ Scripture ID: {manifest['scriptureId']}")
-    print(f"✅ Scripture Name: {manifest['scriptureName']}")
-    print(f"✅ Total Chapters: {manifest['totalChapters']}")
-    print(f"✅ Total Sections: {len(manifest['sections'])}")
-
-    total_chapters_in_sections = sum(s['chapterCount'] for s in manifest['sections'])
-    if manifest['totalChapters'] != total_chapters_in_sections:
-        print(f"❌ Mismatch: totalChapters is {manifest['totalChapters']} but sections contain {total_chapters_in_sections}")
-        return False
-
-    print("\n✅ Manifest validation passed!")
-    return True
+    # Sort chapters by chapter number
+    chapters.sort(key=lambda x: x["chapterNumber"])
+
+    section_entry = {
+        "sectionId": part_id,
+        "sectionName": f"Part {part_id}: {part_name_english}",
+        "sectionNameEnglish": part_name_english,
+        "chapterCount": len(chapters),
+        "chapters": chapters
+    }
+    new_cache[folder_name] = {"fingerprint": fingerprint, "section": section_entry}
+    log.append(f"  ✅ Processed {len(chapters)} chapter(s)")
+    return section_entry, log
 
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
-def main():
-    """Main function to generate the chapter manifest."""
-    print("\n")
-    print("╔══════════════════════════════════════════════════════════╗")
-    print("║                                                      ║")
-    print("║      MYGURUKUL CHAPTER MANIFEST GENERATOR - KAMA SUTRA     ║")
-    print("║                                                      ║")
-    print("╚══════════════════════════════════════════════════════════╝")
-    print("\n")
-
-    try:
-        manifest = generate_chapter_manifest(
-            scripture_root=ROOT_DIRECTORY,
-            scripture_id=SCRIPTURE_ID,
-            scripture_name=SCRIPTURE_NAME
-        )
-
-        if manifest is None:
-            print("\n❌ Failed to generate manifest")
-            exit(1)
-
-        if not validate_manifest(manifest):
-            print("\n❌ Manifest validation failed")
-            exit(1)
-
-        output_filename = f"{SCRIPTURE_ID}_chapter_manifest.json"
-        output_path = Path(ROOT_DIRECTORY).parent / output_filename
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
-
-        print("\n" + "=" * 80)
-        print("SUCCESS!")
-        print("=" * 80)
-        print(f"✅ Generated: {output_path}")
-        print(f"📊 Total Chapters: {manifest['totalChapters']}")
-        print(f"📚 Total Sections (Parts): {len(manifest['sections'])}")
-        print("=" * 80)
-        print("\n📋 NEXT STEPS:")
-        print(f" 1. Review the generated {output_filename}")
-        print(f" 2. Upload the entire KamaSutra folder to GCS at: {GCS_BUCKET}/{GCS_BASE_PATH.rsplit('/', 1)[0]}")
-        print(" 3. Upload the manifest file to its designated location.")
-        print("\n")
-
-    except Exception as e:
-        print(f"\n❌ Fatal Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        exit(1)
+CONFIG = ScriptureConfig(
+    scripture_id=SCRIPTURE_ID,
+    scripture_name=SCRIPTURE_NAME,
+    root=Path(ROOT_DIRECTORY),
+    gcs_base_path=GCS_BASE_PATH,
+    display_name="KAMA SUTRA",
+    section_label="Part",
+    find_sections=find_part_folders,
+    process_section=process_part,
+    output_path=Path(ROOT_DIRECTORY).parent / f"{SCRIPTURE_ID}_chapter_manifest.json",
+    on_start=start_section_cache,
+    on_finish=finish_section_cache,
+    next_steps=(
+        f" 1. Review the generated {SCRIPTURE_ID}_chapter_manifest.json",
+        f" 2. Upload the entire KamaSutra folder to GCS at: {GCS_BUCKET}/{GCS_BASE_PATH.rsplit('/', 1)[0]}",
+        " 3. Upload the manifest file to its designated location.",
+    ),
+)
 
 if __name__ == "__main__":
-    main()
+    run(CONFIG)
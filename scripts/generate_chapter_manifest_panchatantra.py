@@ -1,9 +1,19 @@
-import json
 import re
-import time
-from datetime import datetime
 from pathlib import Path
 
+from manifest_core import (
+    GCS_BUCKET,
+    ScanContext,
+    ScriptureConfig,
+    finish_section_cache,
+    folder_fingerprint,
+    read_chapter_title,
+    read_files,
+    run,
+    start_section_cache,
+    walk_tree,
+)
+
 
 # ============================================================================
 # CONFIGURATION
@@ -12,9 +22,20 @@ from pathlib import Path
 ROOT_DIRECTORY = "/Users/AJ/Desktop/mygurukul-app/Gurukul_Library/Primary_Texts/Sastras/NitiShastra/Panchatantra"
 SCRIPTURE_ID = "panchatantra"
 SCRIPTURE_NAME = "Pañcatantra"
-GCS_BUCKET = "gs://mygurukul-sacred-texts-corpus"
 GCS_BASE_PATH = "Gurukul_Library/Primary_Texts/Sastras/NitiShastra/Panchatantra"
 
+# Every chapter URL starts with this prefix
+GCS_ROOT_URL = f"{GCS_BUCKET}/{GCS_BASE_PATH}"
+
+# Folder-name patterns, compiled once; the helpers below run for every folder
+_TANTRA_RE = re.compile(r"Tantra_(\d+)_(.+)")
+_STORY_RE = re.compile(r"_(?:CAF|WOF|COA|FOP|AWDC)_(\d+)", re.IGNORECASE)
+_PANCHATANTRA_PREFIX_RE = re.compile(r"^Panch(?:a|t)ntra[_-]", re.IGNORECASE)
+_STORY_NUMBER_PREFIX_RE = re.compile(r"^(CAF|WOF|COA|FOP|AWDC)[_-]\d+[_-]", re.IGNORECASE)
+_STORY_PREFIX_RE = re.compile(r"^(CAF|WOF|COA|FOP|AWDC)[_-]", re.IGNORECASE)
+_LEADING_NUMBER_RE = re.compile(r"^\d+[_-]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 # ============================================================================
 # HELPERS
@@ -26,7 +47,7 @@ def extract_tantra_info(folder_name: str) -> tuple:
     Extract Tantra number and name from folder name.
     Example: "Panchtantra_Tantra_1_Conflict_Among Friends" -> (1, "Conflict Among Friends")
     """
-    match = re.search(r"Tantra_(\d+)_(.+)", folder_name)
+    match = _TANTRA_RE.search(folder_name)
     if match:
         try:
             tantra_num = int(match.group(1))
@@ -46,20 +67,9 @@ def get_story_number(folder_name: str) -> int:
     - "Panchtantra_WOF_2_Mother_Shandili" -> 2
     """
     # Pattern: PREFIX_NUMBER_ or PREFIX_NUMBER
-    match = re.search(r"_(CAF|WOF|COA|FOP|AWDC)_(\d+)_", folder_name, re.IGNORECASE)
+    match = _STORY_RE.search(folder_name)
     if match:
-        try:
-            return int(match.group(2))
-        except ValueError:
-            pass
-    
-    # Fallback: look for any number after the prefix
-    match = re.search(r"_(CAF|WOF|COA|FOP|AWDC)_(\d+)", folder_name, re.IGNORECASE)
-    if match:
-        try:
-            return int(match.group(2))
-        except ValueError:
-            pass
+        return int(match.group(1))
     
     return 0
 
@@ -67,231 +77,205 @@ def get_story_number(folder_name: str) -> int:
 def derive_fallback_title(folder_name: str) -> str:
     """Create a human-readable title from the story folder name."""
     # Remove Panchatantra prefix
-    cleaned = re.sub(r"^Panch(?:a|t)ntra[_-]", "", folder_name, flags=re.IGNORECASE)
+    cleaned = _PANCHATANTRA_PREFIX_RE.sub("", folder_name)
     # Remove Tantra prefixes (CAF, WOF, COA, FOP, AWDC) and numbers
-    cleaned = re.sub(r"^(CAF|WOF|COA|FOP|AWDC)[_-]\d+[_-]", "", cleaned, flags=re.IGNORECASE)
-    cleaned = re.sub(r"^(CAF|WOF|COA|FOP|AWDC)[_-]", "", cleaned, flags=re.IGNORECASE)
+    cleaned = _STORY_NUMBER_PREFIX_RE.sub("", cleaned)
+    cleaned = _STORY_PREFIX_RE.sub("", cleaned)
     # Remove leading numbers
-    cleaned = re.sub(r"^\d+[_-]", "", cleaned)
+    cleaned = _LEADING_NUMBER_RE.sub("", cleaned)
     # Replace underscores with spaces
     cleaned = cleaned.replace("_", " ").replace("-", " ")
     # Clean up multiple spaces
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    cleaned = _WHITESPACE_RE.sub(" ", cleaned).strip()
     return cleaned.title() if cleaned else "Panchatantra Story"
 
 
+def find_story_files(file_names: frozenset) -> tuple:
+    """
+    Return (pdf_name, json_name) for a story folder, given the names of its files.
+    pdf_name is None if the folder has no PDF; json_name is None if it has no JSON.
+    """
+    pdf_files = sorted(name for name in file_names if name.endswith(".pdf"))
+    if not pdf_files:
+        return None, None
+
+    pdf_name = pdf_files[0]
+    json_name = pdf_name[:-4] + ".json"
+
+    # Try to find JSON with same base name as PDF
+    if json_name not in file_names:
+        # Try alternative: look for any JSON in the folder
+        json_files = sorted(name for name in file_names if name.endswith(".json"))
+        json_name = json_files[0] if json_files else None
+
+    return pdf_name, json_name
+
+
 # ============================================================================
 # MANIFEST GENERATION
 # ============================================================================
 
 
-def generate_chapter_manifest(root_directory: str):
-    print("=" * 80)
-    print("CHAPTER MANIFEST GENERATOR - PAÑCATANTRA")
-    print("=" * 80)
-    print(f"Scripture: {SCRIPTURE_NAME}")
-    print(f"Root Directory: {root_directory}")
-    print(f"GCS Bucket: {GCS_BUCKET}")
-    print(f"GCS Base Path: {GCS_BASE_PATH}")
-    print("=" * 80)
-
-    root_path = Path(root_directory)
-    if not root_path.exists():
-        print(f"❌ Error: Directory does not exist: {root_directory}")
-        return None
-
-    # Find all Tantra folders (sections)
-    print("\n🔎 Scanning for Tantra folders...")
+def find_tantra_folders(root_path: Path) -> list:
+    """
+    Return ((tantra_num, tantra_name), tantra_folder, story_files) for every Tantra
+    folder, in Tantra order; story_files maps each sub-folder name to its file names.
+    """
+    # One os.walk over the root, Tantra and story folders; everything below is in-memory
+    tree = walk_tree(root_path, max_depth=2)
+    root_dirs, _ = tree[Path(".")]
+    # Parse each folder name once; the (tantra_num, tantra_name) pair is reused
+    # as the sort key and handed to process_tantra
     tantra_folders = sorted(
         [
-            d
-            for d in root_path.iterdir()
-            if d.is_dir() and d.name.startswith("Panchtantra_Tantra_")
+            (extract_tantra_info(name), root_path / name)
+            for name in root_dirs
+            if name.startswith("Panchtantra_Tantra_")
         ],
-        key=lambda d: extract_tantra_info(d.name)[0] or 999,
+        key=lambda item: item[0][0] or 999,
     )
-
-    if not tantra_folders:
-        print(f"❌ Error: No Tantra folders found in {root_directory}")
-        return None
-
-    print(f"✅ Found {len(tantra_folders)} Tantra folder(s)")
-
-    manifest = {
-        "scriptureId": SCRIPTURE_ID,
-        "scriptureName": SCRIPTURE_NAME,
-        "totalChapters": 0,
-        "lastUpdated": datetime.now().strftime("%Y-%m-%dT%H:%M:%S") + "Z",
-        "sections": [],
-    }
-
-    # Process each Tantra (section)
-    for tantra_folder in tantra_folders:
-        tantra_num, tantra_name = extract_tantra_info(tantra_folder.name)
-        if tantra_num is None:
-            print(f"\n⚠️ Skipping {tantra_folder.name} - could not extract Tantra info")
-            continue
-
-        print(f"\n📂 Processing Tantra {tantra_num}: {tantra_name}")
-
-        # Find all story folders in this Tantra
-        story_folders = sorted(
-            [
-                d
-                for d in tantra_folder.iterdir()
-                if d.is_dir()
-                and (d.name.startswith("Panchatantra_") or d.name.startswith("Panchtantra_"))
-            ],
-            key=lambda d: get_story_number(d.name),
+    return [
+        (
+            tantra_info,
+            tantra_folder,
+            {name: tree[Path(tantra_folder.name, name)][1] for name in tree[Path(tantra_folder.name)][0]},
         )
+        for tantra_info, tantra_folder in tantra_folders
+    ]
 
-        if not story_folders:
-            print(f"  ⚠️ No story folders found in {tantra_folder.name}")
-            continue
 
-        print(f"  Found {len(story_folders)} story folder(s)")
-
-        chapters = []
-
-        for story_folder in story_folders:
-            story_num = get_story_number(story_folder.name)
-            print(f"  📖 Processing story {story_num}: {story_folder.name}")
-
-            # Find PDF and JSON files
-            pdf_files = sorted(story_folder.glob("*.pdf"))
-            if not pdf_files:
-                print(f"    ⚠️ No PDF found, skipping")
-                continue
-
-            pdf_path = pdf_files[0]
-            json_path = pdf_path.with_suffix(".json")
-
-            # Try to find JSON with same base name as PDF
-            if not json_path.exists():
-                # Try alternative: look for any JSON in the folder
-                json_files = list(story_folder.glob("*.json"))
-                if json_files:
-                    json_path = json_files[0]
-                else:
-                    json_path = None
-
-            has_metadata = json_path is not None and json_path.exists()
-
-            if not has_metadata:
-                print(f"    ⚠️ Metadata JSON missing")
-
-            # Get title from JSON if available, otherwise use fallback
-            title = derive_fallback_title(story_folder.name)
-            if has_metadata:
-                try:
-                    with open(json_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    title = data.get("chapterTitle", title)
-                except Exception as exc:
-                    print(f"    ⚠️ Could not read metadata JSON: {exc}")
-                    has_metadata = False
-
-            # Construct GCS URLs
-            metadata_url = (
-                f"{GCS_BUCKET}/{GCS_BASE_PATH}/{tantra_folder.name}/{story_folder.name}/{json_path.name}"
-                if has_metadata and json_path
-                else ""
-            )
-            pdf_url = f"{GCS_BUCKET}/{GCS_BASE_PATH}/{tantra_folder.name}/{story_folder.name}/{pdf_path.name}"
-
-            chapter_entry = {
-                "chapterId": str(story_num),
-                "chapterNumber": story_num,
-                "title": title,
-                "titleEnglish": title,  # Same as title for stories
-                "metadataUrl": metadata_url,
-                "pdfUrl": pdf_url,
-                "hasMetadata": has_metadata,
-            }
-
-            chapters.append(chapter_entry)
-            manifest["totalChapters"] += 1
-            time.sleep(0.05)
-
-        # Sort chapters by story number
-        chapters.sort(key=lambda c: c["chapterNumber"])
-
-        # Create section entry (Tantra = Section)
-        section_entry = {
-            "sectionId": str(tantra_num),
-            "sectionName": f"Tantra {tantra_num}: {tantra_name}",
-            "sectionNameEnglish": f"Tantra {tantra_num}: {tantra_name}",
-            "chapterCount": len(chapters),
-            "chapters": chapters,
-        }
-
-        manifest["sections"].append(section_entry)
-        print(f"  ✅ Processed {len(chapters)} story/stories")
-
-    # Sort sections by Tantra number
-    manifest["sections"].sort(key=lambda x: int(x["sectionId"]))
-
-    if not manifest["sections"]:
-        print("❌ No sections were processed successfully")
-        return None
-
-    print(f"\n✅ Compiled {manifest['totalChapters']} total story/stories across {len(manifest['sections'])} Tantra(s)")
-    return manifest
-
-
-# ============================================================================
-# VALIDATION
-# ============================================================================
+def process_tantra(tantra_item: tuple, ctx: ScanContext) -> tuple:
+    """
+    Build the section entry for one ((tantra_num, tantra_name), tantra_folder,
+    story_files) item. Returns (section_entry or None, log lines).
 
+    A Tantra whose fingerprint (story folders included) matches the previous run's
+    section cache reuses its cached entry. Every built or reused entry is recorded
+    in the new cache.
+    """
+    log = []
+    (tantra_num, tantra_name), tantra_folder, story_files = tantra_item
+    old_cache, new_cache = ctx.state
+    if tantra_num is None:
+        log.append(f"\n⚠️ Skipping {tantra_folder.name} - could not extract Tantra info")
+        return None, log
+
+    log.append(f"\n📂 Processing Tantra {tantra_num}: {tantra_name}")
+
+    folder_name = tantra_folder.name
+    fingerprint = folder_fingerprint(tantra_folder, salt=GCS_ROOT_URL, depth=1)
+    cached = old_cache.get(folder_name)
+    if cached and cached.get("fingerprint") == fingerprint:
+        new_cache[folder_name] = cached
+        log.append(f"  ♻️ Unchanged since last run; reusing {cached['section']['chapterCount']} story/stories")
+        return cached["section"], log
+
+    # Find all story folders in this Tantra
+    # (story_num, folder) pairs: each folder's number is parsed once
+    story_folders = sorted(
+        [
+            (get_story_number(name), tantra_folder / name)
+            for name in story_files
+            if name.startswith(("Panchatantra_", "Panchtantra_"))
+        ],
+        key=lambda item: item[0],
+    )
 
-def validate_manifest(manifest):
-    print("\n" + "=" * 80)
-    print("VALIDATING MANIFEST")
-    print("=" * 80)
+    if not story_folders:
+        log.append(f"  ⚠️ No story folders found in {tantra_folder.name}")
+        return None, log
+
+    log.append(f"  Found {len(story_folders)} story folder(s)")
+
+    # Pair up every story's files first, then read all of this Tantra's
+    # metadata JSON in one batch on the shared chapter pool
+    stories = [
+        (story_num, story_folder, *find_story_files(story_files[story_folder.name]))
+        for story_num, story_folder in story_folders
+    ]
+    json_blobs = read_files(
+        (
+            story_folder / json_name
+            for _, story_folder, pdf_name, json_name in stories
+            if pdf_name is not None and json_name is not None
+        ),
+        ctx.pool,
+    )
 
-    if not manifest:
-        print("❌ Manifest is empty or None")
-        return False
+    chapters = []
+    tantra_prefix = f"{GCS_ROOT_URL}/{folder_name}/"
 
-    required_fields = ["scriptureId", "scriptureName", "totalChapters", "sections"]
-    for field in required_fields:
-        if field not in manifest:
-            print(f"❌ Missing required field: {field}")
-            return False
+    for story_num, story_folder, pdf_name, json_name in stories:
+        log.append(f"  📖 Processing story {story_num}: {story_folder.name}")
 
-    if len(manifest["sections"]) == 0:
-        print("❌ No sections found in manifest")
-        return False
+        if pdf_name is None:
+            log.append(f"    ⚠️ No PDF found, skipping")
+            continue
 
-    print(f"✅ Scripture ID: {manifest['scriptureId']}")
-    print(f"✅ Scripture Name: {manifest['scriptureName']}")
-    print(f"✅ Total Chapters: {manifest['totalChapters']}")
-    print(f"✅ Total Sections (Tantras): {len(manifest['sections'])}")
+        has_metadata = json_name is not None
+
+        if not has_metadata:
+            log.append(f"    ⚠️ Metadata JSON missing")
+
+        # Get title from JSON if available, otherwise use fallback
+        title = derive_fallback_title(story_folder.name)
+        if has_metadata:
+            try:
+                raw = json_blobs[story_folder / json_name]
+                if isinstance(raw, OSError):
+                    raise raw
+                title = read_chapter_title(raw, title)
+            except Exception as exc:
+                log.append(f"    ⚠️ Could not read metadata JSON: {exc}")
+                has_metadata = False
+
+        # Construct GCS URLs
+        story_prefix = tantra_prefix + story_folder.name + "/"
+        metadata_url = story_prefix + json_name if has_metadata else ""
+        pdf_url = story_prefix + pdf_name
+
+        chapter_entry = {
+            "chapterId": str(story_num),
+            "chapterNumber": story_num,
+            "title": title,
+            "titleEnglish": title,  # Same as title for stories
+            "metadataUrl": metadata_url,
+            "pdfUrl": pdf_url,
+            "hasMetadata": has_metadata,
+        }
 
-    # Validate each section
-    chapters_with_metadata = 0
-    chapters_without_metadata = 0
+        chapters.append(chapter_entry)
 
-    for section in manifest["sections"]:
-        print(f"\n   Tantra {section['sectionId']}: {section['sectionName']}")
-        print(f"      Stories: {section['chapterCount']}")
+    # Sort chapters by story number
+    chapters.sort(key=lambda c: c["chapterNumber"])
 
-        if section.get("chapterCount", 0) != len(section.get("chapters", [])):
-            print(f"      ❌ Chapter count mismatch")
-            return False
+    # Create section entry (Tantra = Section)
+    section_entry = {
+        "sectionId": str(tantra_num),
+        "sectionName": f"Tantra {tantra_num}: {tantra_name}",
+        "sectionNameEnglish": f"Tantra {tantra_num}: {tantra_name}",
+        "chapterCount": len(chapters),
+        "chapters": chapters,
+    }
 
-        for chapter in section["chapters"]:
-            if chapter.get("hasMetadata", False):
-                chapters_with_metadata += 1
-            else:
-                chapters_without_metadata += 1
+    new_cache[folder_name] = {"fingerprint": fingerprint, "section": section_entry}
+    log.append(f"  ✅ Processed {len(chapters)} story/stories")
+    return section_entry, log
 
-    print(f"\n✅ Stories with JSON metadata: {chapters_with_metadata}")
-    if chapters_without_metadata > 0:
-        print(f"⚠️ Stories without JSON metadata: {chapters_without_metadata}")
 
-    print("\n✅ Manifest validation passed!")
-    return True
+CONFIG = ScriptureConfig(
+    scripture_id=SCRIPTURE_ID,
+    scripture_name=SCRIPTURE_NAME,
+    root=Path(ROOT_DIRECTORY),
+    gcs_base_path=GCS_BASE_PATH,
+    display_name="PAÑCATANTRA",
+    section_label="Tantra",
+    find_sections=find_tantra_folders,
+    process_section=process_tantra,
+    output_path=Path(ROOT_DIRECTORY) / f"{SCRIPTURE_ID}_chapter_manifest.json",
+    on_start=start_section_cache,
+    on_finish=finish_section_cache,
+)
 
 
 # ============================================================================
@@ -299,46 +283,5 @@ def validate_manifest(manifest):
 # ============================================================================
 
 
-def main():
-    print("\n")
-    print("╔══════════════════════════════════════════════════════════╗")
-    print("║                                                          ║")
-    print("║    MYGURUKUL CHAPTER MANIFEST GENERATOR - PAÑCATANTRA     ║")
-    print("║                                                          ║")
-    print("╚══════════════════════════════════════════════════════════╝")
-    print("\n")
-
-    try:
-        manifest = generate_chapter_manifest(ROOT_DIRECTORY)
-        if manifest is None:
-            print("\n❌ Failed to generate manifest")
-            return
-
-        if not validate_manifest(manifest):
-            print("\n❌ Manifest validation failed")
-            return
-
-        output_filename = f"{SCRIPTURE_ID}_chapter_manifest.json"
-        output_path = Path(ROOT_DIRECTORY) / output_filename
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
-
-        print("\n" + "=" * 80)
-        print("SUCCESS!")
-        print("=" * 80)
-        print(f"✅ Generated: {output_path}")
-        print(f"📊 Total Stories: {manifest['totalChapters']}")
-        print(f"📚 Total Sections (Tantras): {len(manifest['sections'])}")
-        print("=" * 80)
-
-    except Exception as exc:
-        print(f"\n❌ Fatal Error: {exc}")
-        raise
-
-
 if __name__ == "__main__":
-    main()
-
-
-
+    run(CONFIG)
@@ -1,9 +1,10 @@
-import json
+import os
 import re
-import time
-from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 
+from manifest_core import GCS_BUCKET, ScanContext, ScriptureConfig, list_pdfs, read_chapter_title, run
+
 
 # ============================================================================
 # CONFIGURATION
@@ -12,15 +13,43 @@ from pathlib import Path
 ROOT_DIRECTORY = "/Users/AJ/Desktop/mygurukul-app/Gurukul_Library/Primary_Texts/Epics/Ramayana"
 SCRIPTURE_ID = "ramayana_valmiki"  # Matches library manifest ID format
 SCRIPTURE_NAME = "Ramayana by Valmiki"
-GCS_BUCKET = "gs://mygurukul-sacred-texts-corpus"
 GCS_BASE_PATH = "Gurukul_Library/Primary_Texts/Epics/Ramayana"
 
+# Every chapter URL starts with this prefix
+GCS_ROOT_URL = f"{GCS_BUCKET}/{GCS_BASE_PATH}"
+
+# Folder / filename patterns, compiled once; the helpers below run for every PDF
+_KANDA_FOLDER_RE = re.compile(r"^\d+\.\s+.+")
+_KANDA_RE = re.compile(r"(\d+)\.\s*(.+?)\s*$")
+_CHAPTER_NUM_RE = re.compile(r"(?:CHAPTER|Chapter)\s+(\d+)", re.IGNORECASE)
+_CHAPTER_ROMAN_RE = re.compile(r"(?:CHAPTER|Chapter)\s+([IVX]+)", re.IGNORECASE)
+# An Arabic "CHAPTER 10 " prefix, then a Roman "CHAPTER IV " one, in one pass
+_STRIP_PREFIX_RE = re.compile(
+    r"^(?:(?:CHAPTER|Chapter)\s+\d+\s+)?(?:(?:CHAPTER|Chapter)\s+[IVX]+\s+)?", re.IGNORECASE
+)
+_DASH_TABLE = str.maketrans("_-", "  ")
+_WS_RE = re.compile(r"\s+")
+
+ROMAN_TO_INT = {
+    'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5,
+    'VI': 6, 'VII': 7, 'VIII': 8, 'IX': 9, 'X': 10,
+    'XI': 11, 'XII': 12, 'XIII': 13, 'XIV': 14, 'XV': 15,
+    'i': 1, 'ii': 2, 'iii': 3, 'iv': 4, 'v': 5,
+    'vi': 6, 'vii': 7, 'viii': 8, 'ix': 9, 'x': 10,
+    'xi': 11, 'xii': 12, 'xiii': 13, 'xiv': 14, 'xv': 15,
+}
+
 
 # ============================================================================
 # HELPERS
 # ============================================================================
 
 
+def _looks_like_kanda(name: str) -> bool:
+    """True for "1. Bala Kanda"-style folder names; most rejects skip the regex."""
+    return name[:1].isdigit() and _KANDA_FOLDER_RE.match(name) is not None
+
+
 def extract_kanda_info(folder_name: str) -> tuple:
     """
     Extract Kanda number and name from folder name.
@@ -29,15 +58,12 @@ def extract_kanda_info(folder_name: str) -> tuple:
     Example: "4. Kishkindha Kanda " -> (4, "Kanda 4: Kishkindha Kanda") (handles trailing space)
     """
     # Match pattern: "1. Bala Kanda" or "4. Kishkindha Kanda "
-    match = re.match(r"(\d+)\.\s*(.+?)\s*$", folder_name)
+    match = _KANDA_RE.match(folder_name)
     if match:
-        try:
-            kanda_num = int(match.group(1))
-            kanda_name = match.group(2).strip()  # Remove trailing spaces
-            normalized_name = f"Kanda {kanda_num}: {kanda_name}"
-            return kanda_num, normalized_name
-        except ValueError:
-            pass
+        kanda_num = int(match.group(1))
+        kanda_name = match.group(2).strip()  # Remove trailing spaces
+        normalized_name = f"Kanda {kanda_num}: {kanda_name}"
+        return kanda_num, normalized_name
     return None, None
 
 
@@ -50,44 +76,29 @@ def extract_chapter_number(filename: str) -> int:
     3. "Chapter 10" -> 10
     """
     # Try Arabic numerals first (most common)
-    match = re.search(r"(?:CHAPTER|Chapter)\s+(\d+)", filename, re.IGNORECASE)
+    match = _CHAPTER_NUM_RE.search(filename)
     if match:
-        try:
-            return int(match.group(1))
-        except ValueError:
-            pass
+        return int(match.group(1))
     
     # Try Roman numerals
-    roman_to_int = {
-        'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5,
-        'VI': 6, 'VII': 7, 'VIII': 8, 'IX': 9, 'X': 10,
-        'XI': 11, 'XII': 12, 'XIII': 13, 'XIV': 14, 'XV': 15,
-        'i': 1, 'ii': 2, 'iii': 3, 'iv': 4, 'v': 5,
-        'vi': 6, 'vii': 7, 'viii': 8, 'ix': 9, 'x': 10,
-        'xi': 11, 'xii': 12, 'xiii': 13, 'xiv': 14, 'xv': 15,
-    }
-    match = re.search(r"(?:CHAPTER|Chapter)\s+([IVX]+)", filename, re.IGNORECASE)
+    match = _CHAPTER_ROMAN_RE.search(filename)
     if match:
         roman = match.group(1).upper()
-        return roman_to_int.get(roman, None)
+        return ROMAN_TO_INT.get(roman, None)
     
     return None
 
 
 def derive_fallback_title(filename: str) -> str:
-    """Create a human-readable title from the filename."""
-    # Remove extension
-    cleaned = Path(filename).stem
+    """Create a human-readable title from a PDF filename."""
+    # Remove the ".pdf" extension; plain slicing, no Path parsing
+    cleaned = filename[:-4]
     
-    # Remove CHAPTER/Chapter prefix and number
-    cleaned = re.sub(r"^(?:CHAPTER|Chapter)\s+\d+\s+", "", cleaned, flags=re.IGNORECASE)
-    cleaned = re.sub(r"^(?:CHAPTER|Chapter)\s+[IVX]+\s+", "", cleaned, flags=re.IGNORECASE)
-    
-    # Replace underscores/hyphens with spaces
-    cleaned = cleaned.replace("_", " ").replace("-", " ")
+    # Remove CHAPTER/Chapter prefix and number, and turn underscores/hyphens into spaces
+    cleaned = _STRIP_PREFIX_RE.sub("", cleaned, count=1).translate(_DASH_TABLE)
     
     # Clean up multiple spaces
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    cleaned = _WS_RE.sub(" ", cleaned).strip()
     
     return cleaned if cleaned else "Ramayana Chapter"
 
@@ -97,197 +108,120 @@ def derive_fallback_title(filename: str) -> str:
 # ============================================================================
 
 
-def generate_chapter_manifest(root_directory: str):
-    print("=" * 80)
-    print("CHAPTER MANIFEST GENERATOR - RAMAYANA")
-    print("=" * 80)
-    print(f"Scripture: {SCRIPTURE_NAME}")
-    print(f"Root Directory: {root_directory}")
-    print(f"GCS Bucket: {GCS_BUCKET}")
-    print(f"GCS Base Path: {GCS_BASE_PATH}")
-    print("=" * 80)
-
-    root_path = Path(root_directory)
-    if not root_path.exists():
-        print(f"❌ Error: Directory does not exist: {root_directory}")
-        return None
-
-    # Find all Kanda folders (sections)
-    print("\n🔎 Scanning for Kanda folders...")
-    kanda_folders = []
-    for d in root_path.iterdir():
-        if d.is_dir() and re.match(r"^\d+\.\s+.+", d.name):
-            kanda_folders.append(d)
-    
-    # Sort by kanda number
-    kanda_folders = sorted(
-        kanda_folders,
-        key=lambda d: extract_kanda_info(d.name)[0] or 999,
-    )
-
-    if not kanda_folders:
-        print(f"❌ Error: No Kanda folders found in {root_directory}")
-        return None
-
-    print(f"✅ Found {len(kanda_folders)} Kanda folder(s)")
-
-    manifest = {
-        "scriptureId": SCRIPTURE_ID,
-        "scriptureName": SCRIPTURE_NAME,
-        "totalChapters": 0,
-        "lastUpdated": datetime.now().strftime("%Y-%m-%dT%H:%M:%S") + "Z",
-        "sections": [],
-    }
-
-    # Process each Kanda (section)
-    for kanda_folder in kanda_folders:
-        kanda_num, normalized_name = extract_kanda_info(kanda_folder.name)
-        if kanda_num is None:
-            print(f"\n⚠️ Skipping {kanda_folder.name} - could not extract Kanda info")
-            continue
-
-        print(f"\n📂 Processing {normalized_name}")
-
-        # Find all PDF files in this Kanda
-        pdf_files = sorted(kanda_folder.glob("*.pdf"))
-
-        if not pdf_files:
-            print(f"  ⚠️ No PDF files found in {kanda_folder.name}")
-            continue
-
-        print(f"  Found {len(pdf_files)} PDF file(s)")
-
-        chapters = []
-
-        for pdf_path in pdf_files:
-            pdf_filename = pdf_path.name
-            
-            # Extract chapter number from filename
-            chapter_num = extract_chapter_number(pdf_filename)
-            
-            if chapter_num is None:
-                print(f"    ⚠️ Could not extract chapter number from: {pdf_filename}")
-                continue
-
-            # Check if corresponding JSON exists
-            json_path = pdf_path.with_suffix(".json")
-            has_metadata = json_path.exists()
-
-            if not has_metadata:
-                print(f"    ⚠️ Metadata JSON missing for: {pdf_filename}")
-
-            # Get title from JSON if available, otherwise use fallback
-            title = derive_fallback_title(pdf_filename)
-            if has_metadata:
-                try:
-                    with open(json_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    title = data.get("chapterTitle", title)
-                except Exception as exc:
-                    print(f"    ⚠️ Could not read metadata JSON: {exc}")
-                    has_metadata = False
-
-            # Construct GCS URLs
-            metadata_url = (
-                f"{GCS_BUCKET}/{GCS_BASE_PATH}/{kanda_folder.name}/{json_path.name}"
-                if has_metadata
-                else ""
-            )
-            pdf_url = f"{GCS_BUCKET}/{GCS_BASE_PATH}/{kanda_folder.name}/{pdf_path.name}"
-
-            chapter_entry = {
-                "chapterId": str(chapter_num),
-                "chapterNumber": chapter_num,
-                "title": title,
-                "titleEnglish": title,  # Same as title for chapters
-                "metadataUrl": metadata_url,
-                "pdfUrl": pdf_url,
-                "hasMetadata": has_metadata,
-            }
-
-            chapters.append(chapter_entry)
-            manifest["totalChapters"] += 1
-            time.sleep(0.01)  # Small delay to avoid overwhelming system
-
-        # Sort chapters by chapter number
-        chapters.sort(key=lambda c: c["chapterNumber"])
-
-        # Create section entry (Kanda = Section)
-        section_entry = {
-            "sectionId": str(kanda_num),
-            "sectionName": normalized_name,
-            "sectionNameEnglish": normalized_name,
-            "chapterCount": len(chapters),
-            "chapters": chapters,
-        }
-
-        manifest["sections"].append(section_entry)
-        print(f"  ✅ Processed {len(chapters)} chapter(s)")
+def find_kanda_folders(root_path: Path) -> list:
+    """Return ((kanda_num, normalized_name), kanda_folder) for every Kanda folder, in Kanda order."""
+    # Parse each folder name once; the (kanda_num, normalized_name) pair is
+    # reused as the sort key and by process_kanda. DirEntry.is_dir() is
+    # answered from the directory listing itself, unlike Path.is_dir().
+    with os.scandir(root_path) as entries:
+        kanda_folders = [
+            (extract_kanda_info(entry.name), Path(entry.path))
+            for entry in entries
+            if entry.is_dir() and _looks_like_kanda(entry.name)
+        ]
 
-    # Sort sections by Kanda number
-    manifest["sections"].sort(key=lambda x: int(x["sectionId"]))
+    # Sort by kanda number (unparsed names last)
+    kanda_folders.sort(key=lambda item: 999 if item[0][0] is None else item[0][0])
+    return kanda_folders
 
-    if not manifest["sections"]:
-        print("❌ No sections were processed successfully")
-        return None
 
-    print(f"\n✅ Compiled {manifest['totalChapters']} total chapter(s) across {len(manifest['sections'])} Kanda(s)")
-    return manifest
+def process_kanda(kanda_item: tuple, ctx: ScanContext) -> tuple:
+    """
+    Build the section entry for one ((kanda_num, normalized_name), kanda_folder)
+    item. Returns (section_entry or None, log lines).
+    """
+    log = []
+    (kanda_num, normalized_name), kanda_folder = kanda_item
+    if kanda_num is None:
+        log.append(f"\n⚠️ Skipping {kanda_folder.name} - could not extract Kanda info")
+        return None, log
 
+    log.append(f"\n📂 Processing {normalized_name}")
 
-# ============================================================================
-# VALIDATION
-# ============================================================================
+    # List the Kanda once; PDFs and their JSON siblings are looked up in it
+    pdf_names, file_names = list_pdfs(kanda_folder)
 
+    if not pdf_names:
+        log.append(f"  ⚠️ No PDF files found in {kanda_folder.name}")
+        return None, log
 
-def validate_manifest(manifest):
-    print("\n" + "=" * 80)
-    print("VALIDATING MANIFEST")
-    print("=" * 80)
+    log.append(f"  Found {len(pdf_names)} PDF file(s)")
 
-    if not manifest:
-        print("❌ Manifest is empty or None")
-        return False
+    chapters = []
+    missing_metadata = 0  # reported once per Kanda rather than per chapter
+    section_prefix = f"{GCS_ROOT_URL}/{kanda_folder.name}/"
 
-    required_fields = ["scriptureId", "scriptureName", "totalChapters", "sections"]
-    for field in required_fields:
-        if field not in manifest:
-            print(f"❌ Missing required field: {field}")
-            return False
+    for pdf_filename in pdf_names:
 
-    if len(manifest["sections"]) == 0:
-        print("❌ No sections found in manifest")
-        return False
+        # Extract chapter number from filename
+        chapter_num = extract_chapter_number(pdf_filename)
+        
+        if chapter_num is None:
+            log.append(f"    ⚠️ Could not extract chapter number from: {pdf_filename}")
+            continue
 
-    print(f"✅ Scripture ID: {manifest['scriptureId']}")
-    print(f"✅ Scripture Name: {manifest['scriptureName']}")
-    print(f"✅ Total Chapters: {manifest['totalChapters']}")
-    print(f"✅ Total Sections (Kandas): {len(manifest['sections'])}")
+        # Check if corresponding JSON exists
+        json_name = pdf_filename[:-4] + ".json"
+        has_metadata = json_name in file_names
+
+        if not has_metadata:
+            missing_metadata += 1
+
+        # Get title from JSON if available, otherwise use fallback
+        title = derive_fallback_title(pdf_filename)
+        if has_metadata:
+            try:
+                title = read_chapter_title((kanda_folder / json_name).read_bytes(), title)
+            except Exception as exc:
+                log.append(f"    ⚠️ Could not read metadata JSON: {exc}")
+                has_metadata = False
+
+        # Construct GCS URLs
+        metadata_url = section_prefix + json_name if has_metadata else ""
+        pdf_url = section_prefix + pdf_filename
+
+        chapter_entry = {
+            "chapterId": str(chapter_num),
+            "chapterNumber": chapter_num,
+            "title": title,
+            "titleEnglish": title,  # Same as title for chapters
+            "metadataUrl": metadata_url,
+            "pdfUrl": pdf_url,
+            "hasMetadata": has_metadata,
+        }
 
-    # Validate each section
-    chapters_with_metadata = 0
-    chapters_without_metadata = 0
+        chapters.append(chapter_entry)
 
-    for section in manifest["sections"]:
-        print(f"\n   {section['sectionName']}")
-        print(f"      Chapters: {section['chapterCount']}")
+    # Sort chapters by chapter number
+    chapters.sort(key=itemgetter("chapterNumber"))
 
-        if section.get("chapterCount", 0) != len(section.get("chapters", [])):
-            print(f"      ❌ Chapter count mismatch")
-            return False
+    # Create section entry (Kanda = Section)
+    section_entry = {
+        "sectionId": str(kanda_num),
+        "sectionName": normalized_name,
+        "sectionNameEnglish": normalized_name,
+        "chapterCount": len(chapters),
+        "chapters": chapters,
+    }
 
-        for chapter in section["chapters"]:
-            if chapter.get("hasMetadata", False):
-                chapters_with_metadata += 1
-            else:
-                chapters_without_metadata += 1
+    if missing_metadata:
+        log.append(f"    ⚠️ Metadata JSON missing for {missing_metadata} chapter(s)")
+    log.append(f"  ✅ Processed {len(chapters)} chapter(s)")
+    return section_entry, log
 
-    print(f"\n✅ Chapters with JSON metadata: {chapters_with_metadata}")
-    if chapters_without_metadata > 0:
-        print(f"⚠️ Chapters without JSON metadata: {chapters_without_metadata}")
 
-    print("\n✅ Manifest validation passed!")
-    return True
+CONFIG = ScriptureConfig(
+    scripture_id=SCRIPTURE_ID,
+    scripture_name=SCRIPTURE_NAME,
+    root=Path(ROOT_DIRECTORY),
+    gcs_base_path=GCS_BASE_PATH,
+    display_name="RAMAYANA",
+    section_label="Kanda",
+    find_sections=find_kanda_folders,
+    process_section=process_kanda,
+    # find_kanda_folders already returns Kandas in number order; no sort_sections
+    output_path=Path(ROOT_DIRECTORY) / f"{SCRIPTURE_ID}_chapter_manifest.json",
+)
 
 
 # ============================================================================
@@ -295,45 +229,5 @@ def validate_manifest(manifest):
 # ============================================================================
 
 
-def main():
-    print("\n")
-    print("╔══════════════════════════════════════════════════════════╗")
-    print("║                                                          ║")
-    print("║  MYGURUKUL CHAPTER MANIFEST GENERATOR - RAMAYANA         ║")
-    print("║                                                          ║")
-    print("╚══════════════════════════════════════════════════════════╝")
-    print("\n")
-
-    try:
-        manifest = generate_chapter_manifest(ROOT_DIRECTORY)
-        if manifest is None:
-            print("\n❌ Failed to generate manifest")
-            return
-
-        if not validate_manifest(manifest):
-            print("\n❌ Manifest validation failed")
-            return
-
-        output_filename = f"{SCRIPTURE_ID}_chapter_manifest.json"
-        output_path = Path(ROOT_DIRECTORY) / output_filename
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
-
-        print("\n" + "=" * 80)
-        print("SUCCESS!")
-        print("=" * 80)
-        print(f"✅ Generated: {output_path}")
-        print(f"📊 Total Chapters: {manifest['totalChapters']}")
-        print(f"📚 Total Sections (Kandas): {len(manifest['sections'])}")
-        print("=" * 80)
-
-    except Exception as exc:
-        print(f"\n❌ Fatal Error: {exc}")
-        raise
-
-
 if __name__ == "__main__":
-    main()
-
-
+    run(CONFIG)
@@ -1,7 +1,8 @@
 import os
-import json
+from operator import itemgetter
 from pathlib import Path
-from datetime import datetime
+
+from manifest_core import GCS_BUCKET, ScanContext, ScriptureConfig, list_pdfs, run
 
 # ============================================================================
 # CONFIGURATION - UPDATE THESE PATHS
@@ -14,12 +15,12 @@ SCRIPTURE_ROOT = "/Users/AJ/Desktop/mygurukul-app/Gurukul_Library/Primary_Texts/
 SCRIPTURE_ID = "sushruta_samhita"
 SCRIPTURE_NAME = "Sushruta Saṃhitā"
 
-# Your actual GCS bucket name
-GCS_BUCKET = "gs://mygurukul-sacred-texts-corpus"
-
 # Base path in GCS where Sushruta_Samhita will be uploaded
 GCS_BASE_PATH = "Gurukul_Library/Primary_Texts/Ayurveda/Sushruta_Samhita"
 
+# Every chapter URL starts with this prefix
+GCS_ROOT_URL = f"{GCS_BUCKET}/{GCS_BASE_PATH}"
+
 # ============================================================================
 # SECTION NAME MAPPINGS (English translations)
 # ============================================================================
@@ -70,11 +71,9 @@ def extract_section_info(folder_name):
 # MANIFEST GENERATION FUNCTION
 # ============================================================================
 
-def generate_chapter_manifest(scripture_root, scripture_id, scripture_name):
+def find_section_folders(root_path):
     """
-    Scans your actual Sushruta_Samhita folder structure and generates manifest.
-    
-    Handles folder names like:
+    Return every section folder, by name. Handles folder names like:
         Sushruta_Samhita_Section_1_Sutrasthanam/
         Sushruta_Samhita_Section_2_Nidanasthanam/
         etc.
@@ -83,241 +82,131 @@ def generate_chapter_manifest(scripture_root, scripture_id, scripture_name):
         Sushruta_Samhita_Section_1_Sutrasthanam_Chapter_1.pdf
         Sushruta_Samhita_Section_1_Sutrasthanam_Chapter_1.json
     """
+    # DirEntry.is_dir() is answered from the directory listing itself
+    with os.scandir(root_path) as entries:
+        return sorted(Path(entry.path) for entry in entries if entry.is_dir())
+
+def process_section_folder(section_folder, ctx: ScanContext):
+    """
+    Build the section entry for one section folder.
+    Returns (section_entry or None, log lines).
+    """
+    log = []
+    folder_name = section_folder.name
+    log.append(f"\n📂 Processing: {folder_name}")
     
-    print("=" * 80)
-    print("CHAPTER MANIFEST GENERATOR - SUSHRUTA SAMHITA")
-    print("=" * 80)
-    print(f"Scripture: {scripture_name}")
-    print(f"Root Directory: {scripture_root}")
-    print(f"GCS Bucket: {GCS_BUCKET}")
-    print(f"GCS Path: {GCS_BASE_PATH}")
-    print("=" * 80)
+    # Extract section info
+    section_id, section_name, section_english = extract_section_info(folder_name)
     
-    manifest = {
-        "scriptureId": scripture_id,
-        "scriptureName": scripture_name,
-        "totalChapters": 0,
-        "lastUpdated": datetime.now().strftime("%Y-%m-%dT%H:%M:%S") + "Z",
-        "sections": []
-    }
+    log.append(f"   Section ID: {section_id}")
+    log.append(f"   Section Name: {section_name}")
+    log.append(f"   English: {section_english}")
     
-    root_path = Path(scripture_root)
+    chapters = []
     
-    if not root_path.exists():
-        print(f"❌ Error: Directory does not exist: {scripture_root}")
-        return None
+    # List the section once; PDFs and their JSON siblings are looked up in it
+    pdf_names, file_names = list_pdfs(section_folder)
     
-    # Find all section folders
-    print("\n🔎 Scanning for section folders...")
-    section_folders = sorted([d for d in root_path.iterdir() if d.is_dir()])
+    if not pdf_names:
+        log.append(f"   ⚠️ No PDF files found in {folder_name}")
+        return None, log
     
-    if not section_folders:
-        print(f"❌ Error: No section folders found in {scripture_root}")
-        return None
+    log.append(f"   Found {len(pdf_names)} PDF file(s)")
     
-    print(f"✅ Found {len(section_folders)} section folder(s)")
+    section_prefix = f"{GCS_ROOT_URL}/{folder_name}/"
+    missing_metadata = 0  # reported once per section rather than per chapter
     
-    # Process each section
-    for section_folder in section_folders:
-        folder_name = section_folder.name
-        print(f"\n📂 Processing: {folder_name}")
-        
-        # Extract section info
-        section_id, section_name, section_english = extract_section_info(folder_name)
-        
-        print(f"   Section ID: {section_id}")
-        print(f"   Section Name: {section_name}")
-        print(f"   English: {section_english}")
-        
-        chapters = []
-        
-        # Find all PDF files in this section
-        pdf_files = sorted(section_folder.glob("*.pdf"))
-        
-        if not pdf_files:
-            print(f"   ⚠️ No PDF files found in {folder_name}")
-            continue
-        
-        print(f"   Found {len(pdf_files)} PDF file(s)")
-        
-        for pdf_path in pdf_files:
-            # Extract chapter number from filename
-            # Example: "Sushruta_Samhita_Section_1_Sutrasthanam_Chapter_4.pdf"
-            
-            pdf_filename = pdf_path.stem  # filename without extension
-            
-            # Try to extract chapter number
-            chapter_num = None
-            if "Chapter_" in pdf_filename:
-                try:
-                    chapter_part = pdf_filename.split("Chapter_")[1]
-                    # Handle cases like "Chapter_4" or "Chapter_4_something"
-                    chapter_num = chapter_part.split('_')[0] if '_' in chapter_part else chapter_part
-                    chapter_num = int(chapter_num)
-                except Exception as e:
-                    print(f"   ⚠️ Could not extract chapter number from: {pdf_path.name}")
-                    continue
-            else:
-                print(f"   ⚠️ Filename does not contain 'Chapter_': {pdf_path.name}")
-                continue
-            
-            # Check if corresponding JSON exists
-            json_path = pdf_path.with_suffix('.json')
-            if not json_path.exists():
-                print(f"   ⚠️ Missing JSON for: {pdf_path.name}")
-                has_metadata = False
-            else:
-                has_metadata = True
-            
-            # Construct GCS URLs matching your actual bucket structure
-            metadata_url = f"{GCS_BUCKET}/{GCS_BASE_PATH}/{folder_name}/{json_path.name}"
-            pdf_url = f"{GCS_BUCKET}/{GCS_BASE_PATH}/{folder_name}/{pdf_path.name}"
-            
-            # Create chapter entry
-            chapter_entry = {
-                "chapterId": str(chapter_num),
-                "chapterNumber": chapter_num,
-                "title": f"Chapter {chapter_num}",
-                "titleEnglish": "",
-                "metadataUrl": metadata_url,
-                "pdfUrl": pdf_url,
-                "hasMetadata": has_metadata
-            }
-            
-            chapters.append(chapter_entry)
-            manifest["totalChapters"] += 1
-        
-        # Sort chapters by chapter number
-        chapters.sort(key=lambda x: x["chapterNumber"])
-        
-        # Create section entry
-        section_entry = {
-            "sectionId": section_id,
-            "sectionName": section_name,
-            "sectionNameEnglish": section_english,
-            "chapterCount": len(chapters),
-            "chapters": chapters
-        }
-        
-        manifest["sections"].append(section_entry)
-        print(f"   ✅ Processed {len(chapters)} chapter(s)")
+    for pdf_name in pdf_names:
+        # Extract chapter number from filename
+        # Example: "Sushruta_Samhita_Section_1_Sutrasthanam_Chapter_4.pdf"
     
-    # Sort sections by section ID
-    try:
-        manifest["sections"].sort(key=lambda x: int(x["sectionId"]))
-    except:
-        pass  # If section IDs are not numeric, keep original order
+        pdf_filename = pdf_name[:-4]  # filename without extension
     
-    return manifest
-
-# ============================================================================
-# VALIDATION FUNCTION
-# ============================================================================
-
-def validate_manifest(manifest):
-    """Validate the generated manifest for completeness."""
-    
-    print("\n" + "=" * 80)
-    print("VALIDATING MANIFEST")
-    print("=" * 80)
-    
-    if not manifest:
-        print("❌ Manifest is empty or None")
-        return False
-    
-    # Check required fields
-    required_fields = ["scriptureId", "scriptureName", "totalChapters", "sections"]
-    for field in required_fields:
-        if field not in manifest:
-            print(f"❌ Missing required field: {field}")
-            return False
-    
-    if len(manifest["sections"]) == 0:
-        print("❌ No sections found in manifest")
-        return False
+        # Try to extract chapter number
+        chapter_num = None
+        if "Chapter_" in pdf_filename:
+            try:
+                chapter_part = pdf_filename.split("Chapter_")[1]
+                # Handle cases like "Chapter_4" or "Chapter_4_something"
+                chapter_num = chapter_part.split('_')[0] if '_' in chapter_part else chapter_part
+                chapter_num = int(chapter_num)
+            except Exception as e:
+                log.append(f"   ⚠️ Could not extract chapter number from: {pdf_name}")
+                continue
+        else:
+            log.append(f"   ⚠️ Filename does not contain 'Chapter_': {pdf_name}")
+            continue
     
-    print(f"✅ Scripture ID: {manifest['scriptureId']}")
-    print(f"✅ Scripture Name: {manifest['scriptureName']}")
-    print(f"✅ Total Chapters: {manifest['totalChapters']}")
-    print(f"✅ Total Sections: {len(manifest['sections'])}")
+        # Check if corresponding JSON exists
+        json_name = pdf_filename + ".json"
+        if json_name not in file_names:
+            missing_metadata += 1
+            has_metadata = False
+        else:
+            has_metadata = True
+    
+        # Construct GCS URLs matching your actual bucket structure
+        metadata_url = section_prefix + json_name
+        pdf_url = section_prefix + pdf_name
+    
+        # Create chapter entry
+        chapter_entry = {
+            "chapterId": str(chapter_num),
+            "chapterNumber": chapter_num,
+            "title": f"Chapter {chapter_num}",
+            "titleEnglish": "",
+            "metadataUrl": metadata_url,
+            "pdfUrl": pdf_url,
+            "hasMetadata": has_metadata
+        }
     
-    # Validate each section
-    chapters_with_metadata = 0
-    chapters_without_metadata = 0
+        chapters.append(chapter_entry)
     
-    for section in manifest["sections"]:
-        print(f"\n   Section {section['sectionId']}: {section['sectionName']}")
-        print(f"      Chapters: {section['chapterCount']}")
-        
-        for chapter in section["chapters"]:
-            if chapter.get("hasMetadata", False):
-                chapters_with_metadata += 1
-            else:
-                chapters_without_metadata += 1
+    # Sort chapters by chapter number
+    chapters.sort(key=itemgetter("chapterNumber"))
     
-    print(f"\n✅ Chapters with JSON metadata: {chapters_with_metadata}")
-    if chapters_without_metadata > 0:
-        print(f"⚠️ Chapters without JSON metadata: {chapters_without_metadata}")
+    # Create section entry
+    section_entry = {
+        "sectionId": section_id,
+        "sectionName": section_name,
+        "sectionNameEnglish": section_english,
+        "chapterCount": len(chapters),
+        "chapters": chapters
+    }
     
-    print("\n✅ Manifest validation passed!")
-    return True
+    if missing_metadata:
+        log.append(f"   ⚠️ Missing JSON for {missing_metadata} chapter(s)")
+    log.append(f"   ✅ Processed {len(chapters)} chapter(s)")
+    return section_entry, log
 
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
+CONFIG = ScriptureConfig(
+    scripture_id=SCRIPTURE_ID,
+    scripture_name=SCRIPTURE_NAME,
+    root=Path(SCRIPTURE_ROOT),
+    gcs_base_path=GCS_BASE_PATH,
+    display_name="SUSHRUTA SAMHITA",
+    section_label="Section",
+    find_sections=find_section_folders,
+    process_section=process_section_folder,
+    # Folders come back in name order; sections are put in numeric order
+    sort_sections=True,
+    # Written to the working directory, not next to the scripture folder
+    output_path=Path(f"{SCRIPTURE_ID}_chapter_manifest.json"),
+    next_steps=(
+        "   1. Review the generated JSON file",
+        "   2. Upload to GCS:",
+        f"      a) Navigate to: {GCS_BUCKET}/Gurukul_Library/Primary_Texts/Ayurveda/",
+        "      b) Upload your entire Sushruta_Samhita folder (with all section subfolders)",
+        "      c) Upload this manifest JSON to Metadata folder",
+        "   3. Verify permissions (allUsers = Storage Object Viewer)",
+        "   4. Test access with curl",
+        "   5. Ready for frontend display!",
+    ),
+)
+
 if __name__ == "__main__":
-    print("\n")
-    print("╔════════════════════════════════════════════════════════════╗")
-    print("║                                                            ║")
-    print("║     MYGURUKUL CHAPTER MANIFEST GENERATOR - SUSHRUTA        ║")
-    print("║                                                            ║")
-    print("╚════════════════════════════════════════════════════════════╝")
-    print("\n")
-    
-    try:
-        # Generate manifest
-        manifest = generate_chapter_manifest(
-            scripture_root=SCRIPTURE_ROOT,
-            scripture_id=SCRIPTURE_ID,
-            scripture_name=SCRIPTURE_NAME
-        )
-        
-        if manifest is None:
-            print("\n❌ Failed to generate manifest")
-            exit(1)
-        
-        # Validate manifest
-        if not validate_manifest(manifest):
-            print("\n❌ Manifest validation failed")
-            exit(1)
-        
-        # Save manifest
-        output_filename = f"{SCRIPTURE_ID}_chapter_manifest.json"
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
-        
-        print("\n" + "=" * 80)
-        print("SUCCESS!")
-        print("=" * 80)
-        print(f"✅ Generated: {output_filename}")
-        print(f"📊 Total Chapters: {manifest['totalChapters']}")
-        print(f"📚 Total Sections: {len(manifest['sections'])}")
-        print("=" * 80)
-        
-        print("\n📋 NEXT STEPS:")
-        print("   1. Review the generated JSON file")
-        print("   2. Upload to GCS:")
-        print(f"      a) Navigate to: {GCS_BUCKET}/Gurukul_Library/Primary_Texts/Ayurveda/")
-        print(f"      b) Upload your entire Sushruta_Samhita folder (with all section subfolders)")
-        print(f"      c) Upload this manifest JSON to Metadata folder")
-        print("   3. Verify permissions (allUsers = Storage Object Viewer)")
-        print("   4. Test access with curl")
-        print("   5. Ready for frontend display!")
-        print("\n")
-        
-    except Exception as e:
-        print(f"\n❌ Fatal Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        exit(1)
+    run(CONFIG)
@@ -5,12 +5,13 @@ Vastu Sastra Chapter Manifest Generator
 Generates a chapter manifest JSON file for Vastu Sastra based on the folder structure.
 """
 
-import json
+import os
 import re
-import time
-from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 
+from manifest_core import GCS_BUCKET, ScanContext, ScriptureConfig, list_pdfs, read_chapter_title, run
+
 
 # ============================================================================
 # CONFIGURATION
@@ -19,38 +20,47 @@ from pathlib import Path
 ROOT_DIRECTORY = "/Users/AJ/Desktop/mygurukul-app/Gurukul_Library/Primary_Texts/Sastras/VastuShastra/Vastu Sastra"
 SCRIPTURE_ID = "Vastu_Sastra"
 SCRIPTURE_NAME = "Vastu Sastra Viswakarma"
-GCS_BUCKET = "gs://mygurukul-sacred-texts-corpus"
 # Note: GCS path does NOT include "Vastu Sastra" - Parts are directly under VastuShastra/
 GCS_BASE_PATH = "Gurukul_Library/Primary_Texts/Sastras/VastuShastra"
 
+# Every chapter URL starts with this prefix
+GCS_ROOT_URL = f"{GCS_BUCKET}/{GCS_BASE_PATH}"
+
+# Folder / filename patterns, compiled once; the helpers below run for every PDF
+_PART_FOLDER_RE = re.compile(r"Part\s+\d+", re.IGNORECASE)
+_PART_RE = re.compile(r"Part\s+(\d+)\s+(.+)", re.IGNORECASE)
+_CHAPTER_RE = re.compile(r"Chapter\s+(\d+)", re.IGNORECASE)
+_STRIP_CHAPTER_RE = re.compile(r"^Chapter\s+\d+\s*[-:]?\s*", re.IGNORECASE)
+_WS_RE = re.compile(r"\s+")
+_DASH_TABLE = str.maketrans("_-", "  ")
+
 
 # ============================================================================
 # HELPERS
 # ============================================================================
 
 
+def _looks_like_part(name: str) -> bool:
+    """True for "Part 1 ..." folder names; most rejects skip the regex."""
+    return "part" in name.lower() and _PART_FOLDER_RE.search(name) is not None
+
+
 def extract_part_info(folder_name: str) -> tuple:
     """Extract Part number and name from folder name."""
-    match = re.search(r"Part\s+(\d+)\s+(.+)", folder_name, re.IGNORECASE)
+    match = _PART_RE.search(folder_name)
     if match:
-        try:
-            part_num = int(match.group(1))
-            part_name = match.group(2).strip()
-            return part_num, part_name
-        except ValueError:
-            pass
+        part_num = int(match.group(1))
+        part_name = match.group(2).strip()
+        return part_num, part_name
     return None, None
 
 
 def get_chapter_number(filename: str) -> int:
     """Extract chapter number from filename."""
     # Pattern: "Chapter 1", "Chapter 2", etc.
-    match = re.search(r"Chapter\s+(\d+)", filename, re.IGNORECASE)
+    match = _CHAPTER_RE.search(filename)
     if match:
-        try:
-            return int(match.group(1))
-        except ValueError:
-            pass
+        return int(match.group(1))
     
     # Handle "Introduction" files - assign 0 or a high number
     if "Introduction" in filename or "Introductory" in filename:
@@ -60,13 +70,13 @@ def get_chapter_number(filename: str) -> int:
 
 
 def derive_fallback_title(filename: str) -> str:
-    """Extract title from filename as fallback."""
-    # Remove file extension
-    stem = Path(filename).stem
+    """Extract title from a PDF filename as fallback."""
+    # Remove the ".pdf" extension; plain slicing, no Path parsing
+    stem = filename[:-4]
     # Remove "Chapter X" prefix if present
-    cleaned = re.sub(r"^Chapter\s+\d+\s*[-:]?\s*", "", stem, flags=re.IGNORECASE)
-    cleaned = cleaned.replace("_", " ").replace("-", " ")
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    cleaned = _STRIP_CHAPTER_RE.sub("", stem)
+    cleaned = cleaned.translate(_DASH_TABLE)
+    cleaned = _WS_RE.sub(" ", cleaned).strip()
     return cleaned or filename
 
 
@@ -75,200 +85,133 @@ def derive_fallback_title(filename: str) -> str:
 # ============================================================================
 
 
-def generate_chapter_manifest(root_directory: str):
-    print("=" * 80)
-    print("CHAPTER MANIFEST GENERATOR - VASTU SASTRA")
-    print("=" * 80)
-    print(f"Scripture: {SCRIPTURE_NAME}")
-    print(f"Root Directory: {root_directory}")
-    print(f"GCS Bucket: {GCS_BUCKET}")
-    print(f"GCS Base Path: {GCS_BASE_PATH}")
-    print("=" * 80)
-
-    root_path = Path(root_directory)
-    if not root_path.exists():
-        print(f"❌ Error: Directory does not exist: {root_directory}")
-        return None
-
-    # Find all Part folders (sections)
-    print("\n🔎 Scanning for Part folders...")
-    part_folders = sorted(
-        [
-            d
-            for d in root_path.iterdir()
-            if d.is_dir() and re.search(r"Part\s+\d+", d.name, re.IGNORECASE)
-        ],
-        key=lambda d: extract_part_info(d.name)[0] or 999,
+def find_part_folders(root_path: Path) -> list:
+    """Return ((part_num, part_name), part_folder) for every Part folder, in Part order."""
+    # Parse each folder name once; the (part_num, part_name) pair is reused
+    # as the sort key and by process_part. DirEntry.is_dir() is answered from
+    # the directory listing itself, unlike Path.is_dir().
+    with os.scandir(root_path) as entries:
+        return sorted(
+            [
+                (extract_part_info(entry.name), Path(entry.path))
+                for entry in entries
+                if entry.is_dir() and _looks_like_part(entry.name)
+            ],
+            key=lambda item: 999 if item[0][0] is None else item[0][0],
+        )
+
+
+def process_part(part_item: tuple, ctx: ScanContext) -> tuple:
+    """
+    Build the section entry for one ((part_num, part_name), part_folder) item.
+    Returns (section_entry or None, log lines).
+    """
+    log = []
+    (part_num, part_name), part_folder = part_item
+    if part_num is None:
+        log.append(f"\n⚠️ Skipping {part_folder.name} - could not extract Part info")
+        return None, log
+    
+    log.append(f"\n📂 Processing Part {part_num}: {part_name}")
+    
+    # List the Part once; PDFs and their JSON siblings are looked up in it.
+    # Names are sorted first so PDFs with the same chapter number keep a stable
+    # order, and each (chapter_num, name) pair is parsed once.
+    pdf_names, file_names = list_pdfs(part_folder)
+    numbered_pdfs = sorted(
+        [(get_chapter_number(name), name) for name in pdf_names],
+        key=itemgetter(0),
     )
-
-    if not part_folders:
-        print(f"❌ Error: No Part folders found in {root_directory}")
-        return None
-
-    print(f"✅ Found {len(part_folders)} Part folder(s)")
-
-    manifest = {
-        "scriptureId": SCRIPTURE_ID,
-        "scriptureName": SCRIPTURE_NAME,
-        "totalChapters": 0,
-        "lastUpdated": datetime.now().strftime("%Y-%m-%dT%H:%M:%S") + "Z",
-        "sections": [],
-    }
-
-    # Process each Part (section)
-    for part_folder in part_folders:
-        part_num, part_name = extract_part_info(part_folder.name)
-        if part_num is None:
-            print(f"\n⚠️ Skipping {part_folder.name} - could not extract Part info")
-            continue
-
-        print(f"\n📂 Processing Part {part_num}: {part_name}")
-
-        # Find all PDF files in this Part
-        pdf_files = sorted(part_folder.glob("*.pdf"), key=lambda p: get_chapter_number(p.name))
-
-        if not pdf_files:
-            print(f"  ⚠️ No PDF files found in {part_folder.name}")
+    
+    if not numbered_pdfs:
+        log.append(f"  ⚠️ No PDF files found in {part_folder.name}")
+        return None, log
+    
+    log.append(f"  Found {len(numbered_pdfs)} PDF file(s)")
+    
+    chapters = []
+    missing_metadata = 0  # reported once per Part rather than per chapter
+    section_prefix = f"{GCS_ROOT_URL}/{part_folder.name}/"
+    
+    for chapter_num, pdf_name in numbered_pdfs:
+    
+        # Skip if it's an introduction file (we'll handle it separately if needed)
+        if chapter_num == 0 and "Introduction" not in pdf_name and "Introductory" not in pdf_name:
             continue
-
-        print(f"  Found {len(pdf_files)} PDF file(s)")
-
-        chapters = []
-
-        for pdf_path in pdf_files:
-            chapter_num = get_chapter_number(pdf_path.name)
-            
-            # Skip if it's an introduction file (we'll handle it separately if needed)
-            if chapter_num == 0 and "Introduction" not in pdf_path.name and "Introductory" not in pdf_path.name:
-                continue
-
-            json_path = pdf_path.with_suffix(".json")
-            has_metadata = json_path.exists()
-
-            if not has_metadata:
-                print(f"    ⚠️ Metadata JSON missing for: {pdf_path.name}")
-
-            # Get title from JSON if available, otherwise use fallback
-            title = derive_fallback_title(pdf_path.name)
-            title_english = title
-            
-            if has_metadata:
-                try:
-                    with open(json_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    title = data.get("chapterTitle", title)
-                    title_english = title
-                except Exception as exc:
-                    print(f"    ⚠️ Could not read metadata JSON: {exc}")
-                    has_metadata = False
-
-            # Construct GCS URLs
-            # Note: Files are directly under VastuShastra/ in GCS, not under Vastu Sastra/
-            # Pattern: gs://mygurukul-sacred-texts-corpus/Gurukul_Library/Primary_Texts/Sastras/VastuShastra/Part 1 The Fundamental Canons/Chapter 1 Introductory Part 1.pdf
-            metadata_url = f"{GCS_BUCKET}/{GCS_BASE_PATH}/{part_folder.name}/{json_path.name}" if has_metadata else ""
-            pdf_url = f"{GCS_BUCKET}/{GCS_BASE_PATH}/{part_folder.name}/{pdf_path.name}"
-
-            # For chapter numbering, use sequential numbering within the part
-            # Introduction files get chapter 0, then chapters are numbered 1, 2, 3...
-            if chapter_num == 0:
-                chapter_id = "0"
-            else:
-                chapter_id = str(chapter_num)
-
-            chapter_entry = {
-                "chapterId": chapter_id,
-                "chapterNumber": chapter_num if chapter_num != 999 else len(chapters) + 1,
-                "title": title,
-                "titleEnglish": title_english,
-                "metadataUrl": metadata_url,
-                "pdfUrl": pdf_url,
-                "hasMetadata": has_metadata,
-            }
-
-            chapters.append(chapter_entry)
-            manifest["totalChapters"] += 1
-            print(f"    ✅ Chapter {chapter_num}: {title[:50]}...")
-            time.sleep(0.05)
-
-        # Sort chapters by chapter number
-        chapters.sort(key=lambda c: c["chapterNumber"])
-
-        # Create section entry (Part = Section)
-        section_entry = {
-            "sectionId": str(part_num),
-            "sectionName": f"Part {part_num}: {part_name}",
-            "sectionNameEnglish": f"Part {part_num}: {part_name}",
-            "chapterCount": len(chapters),
-            "chapters": chapters,
+    
+        json_name = pdf_name[:-4] + ".json"
+        has_metadata = json_name in file_names
+    
+        if not has_metadata:
+            missing_metadata += 1
+    
+        # Get title from JSON if available, otherwise use fallback
+        title = derive_fallback_title(pdf_name)
+        title_english = title
+    
+        if has_metadata:
+            try:
+                title = read_chapter_title((part_folder / json_name).read_bytes(), title)
+                title_english = title
+            except Exception as exc:
+                log.append(f"    ⚠️ Could not read metadata JSON: {exc}")
+                has_metadata = False
+    
+        # Construct GCS URLs
+        # Note: Files are directly under VastuShastra/ in GCS, not under Vastu Sastra/
+        # Pattern: gs://mygurukul-sacred-texts-corpus/Gurukul_Library/Primary_Texts/Sastras/VastuShastra/Part 1 The Fundamental Canons/Chapter 1 Introductory Part 1.pdf
+        metadata_url = section_prefix + json_name if has_metadata else ""
+        pdf_url = section_prefix + pdf_name
+    
+        # For chapter numbering, use sequential numbering within the part
+        # Introduction files get chapter 0, then chapters are numbered 1, 2, 3...
+        if chapter_num == 0:
+            chapter_id = "0"
+        else:
+            chapter_id = str(chapter_num)
+    
+        chapter_entry = {
+            "chapterId": chapter_id,
+            "chapterNumber": chapter_num if chapter_num != 999 else len(chapters) + 1,
+            "title": title,
+            "titleEnglish": title_english,
+            "metadataUrl": metadata_url,
+            "pdfUrl": pdf_url,
+            "hasMetadata": has_metadata,
         }
-
-        manifest["sections"].append(section_entry)
-        print(f"  ✅ Processed {len(chapters)} chapter(s)")
-
-    # Sort sections by Part number
-    manifest["sections"].sort(key=lambda x: int(x["sectionId"]))
-
-    if not manifest["sections"]:
-        print("❌ No sections were processed successfully")
-        return None
-
-    print(f"\n✅ Compiled {manifest['totalChapters']} total chapters across {len(manifest['sections'])} Part(s)")
-    return manifest
-
-
-# ============================================================================
-# VALIDATION
-# ============================================================================
-
-
-def validate_manifest(manifest):
-    print("\n" + "=" * 80)
-    print("VALIDATING MANIFEST")
-    print("=" * 80)
-
-    if not manifest:
-        print("❌ Manifest is empty or None")
-        return False
-
-    required_fields = ["scriptureId", "scriptureName", "totalChapters", "sections"]
-    for field in required_fields:
-        if field not in manifest:
-            print(f"❌ Missing required field: {field}")
-            return False
-
-    if len(manifest["sections"]) == 0:
-        print("❌ No sections found in manifest")
-        return False
-
-    print(f"✅ Scripture ID: {manifest['scriptureId']}")
-    print(f"✅ Scripture Name: {manifest['scriptureName']}")
-    print(f"✅ Total Chapters: {manifest['totalChapters']}")
-    print(f"✅ Total Sections (Parts): {len(manifest['sections'])}")
-
-    # Validate each section
-    chapters_with_metadata = 0
-    chapters_without_metadata = 0
-
-    for section in manifest["sections"]:
-        print(f"\n   Part {section['sectionId']}: {section['sectionName']}")
-        print(f"      Chapters: {section['chapterCount']}")
-
-        if section.get("chapterCount", 0) != len(section.get("chapters", [])):
-            print(f"      ❌ Chapter count mismatch")
-            return False
-
-        for chapter in section["chapters"]:
-            if chapter.get("hasMetadata", False):
-                chapters_with_metadata += 1
-            else:
-                chapters_without_metadata += 1
-
-    print(f"\n✅ Chapters with JSON metadata: {chapters_with_metadata}")
-    if chapters_without_metadata > 0:
-        print(f"⚠️ Chapters without JSON metadata: {chapters_without_metadata}")
-
-    print("\n✅ Manifest validation passed!")
-    return True
+    
+        chapters.append(chapter_entry)
+    
+    # Sort chapters by chapter number
+    chapters.sort(key=itemgetter("chapterNumber"))
+    
+    # Create section entry (Part = Section)
+    section_entry = {
+        "sectionId": str(part_num),
+        "sectionName": f"Part {part_num}: {part_name}",
+        "sectionNameEnglish": f"Part {part_num}: {part_name}",
+        "chapterCount": len(chapters),
+        "chapters": chapters,
+    }
+    
+    if missing_metadata:
+        log.append(f"    ⚠️ Metadata JSON missing for {missing_metadata} chapter(s)")
+    log.append(f"  ✅ Processed {len(chapters)} chapter(s)")
+    return section_entry, log
+
+
+CONFIG = ScriptureConfig(
+    scripture_id=SCRIPTURE_ID,
+    scripture_name=SCRIPTURE_NAME,
+    root=Path(ROOT_DIRECTORY),
+    gcs_base_path=GCS_BASE_PATH,
+    display_name="VASTU SASTRA",
+    section_label="Part",
+    find_sections=find_part_folders,
+    process_section=process_part,
+    # find_part_folders already returns Parts in number order; no sort_sections
+    output_path=Path(ROOT_DIRECTORY) / f"{SCRIPTURE_ID}_chapter_manifest.json",
+)
 
 
 # ============================================================================
@@ -276,44 +219,5 @@ def validate_manifest(manifest):
 # ============================================================================
 
 
-def main():
-    print("\n")
-    print("╔══════════════════════════════════════════════════════════╗")
-    print("║                                                          ║")
-    print("║   MYGURUKUL CHAPTER MANIFEST GENERATOR - VASTU SASTRA     ║")
-    print("║                                                          ║")
-    print("╚══════════════════════════════════════════════════════════╝")
-    print("\n")
-
-    try:
-        manifest = generate_chapter_manifest(ROOT_DIRECTORY)
-        if manifest is None:
-            print("\n❌ Failed to generate manifest")
-            return
-
-        if not validate_manifest(manifest):
-            print("\n❌ Manifest validation failed")
-            return
-
-        output_filename = f"{SCRIPTURE_ID}_chapter_manifest.json"
-        output_path = Path(ROOT_DIRECTORY) / output_filename
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
-
-        print("\n" + "=" * 80)
-        print("SUCCESS!")
-        print("=" * 80)
-        print(f"✅ Generated: {output_path}")
-        print(f"📊 Total Chapters: {manifest['totalChapters']}")
-        print(f"📚 Total Sections (Parts): {len(manifest['sections'])}")
-        print("=" * 80)
-
-    except Exception as exc:
-        print(f"\n❌ Fatal Error: {exc}")
-        raise
-
-
 if __name__ == "__main__":
-    main()
-
+    run(CONFIG)
@@ -17,14 +17,30 @@ Directory structure:
         └── ...
 """
 
-import json
+import contextlib
+import functools
+import io
+import itertools
 import os
 import re
+import sys
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from collections import defaultdict
 
+# orjson is optional; it parses the chapter JSON and writes the dictionary
+# several times faster than json (see json_compat)
+from json_compat import dumps as _dumps, loads as _loads
+
+# pyahocorasick is optional; without it related concepts are found with one
+# substring scan per concept name
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # ====== CONFIGURATION - UPDATE THESE PATHS ======
 
 # Base directory for your Gurukul Library
@@ -40,38 +56,91 @@ SCRIPTURES = [
 CURRENT_DICT_PATH = Path("/Users/AJ/Desktop/mygurukul-app/src/lib/data/ayurveda_terms.json")
 OUTPUT_PATH = Path("/Users/AJ/Desktop/mygurukul-app/src/lib/data/ayurveda_terms_auto.json")
 
+# Pass 2 is CPU-bound Python, so chapter files are spread over processes
+MAX_WORKERS = os.cpu_count() or 1
+
 # ================================================
 
+# str.translate table that deletes every nonspacing mark (category Mn), so
+# stripping diacritics is one C-level pass instead of a category() call per char
+_MN_TABLE = dict.fromkeys(
+    cp for cp in range(0x110000) if unicodedata.category(chr(cp)) == 'Mn'
+)
+
+# English words in a definition (alphanumeric + hyphen, 4+ chars), compiled once
+_WORD_RE = re.compile(r'\b[a-z][a-z-]{3,}\b')
+
+# Common stop words dropped from a definition's English terms
+_STOP_WORDS = frozenset({
+    'the', 'and', 'that', 'which', 'this', 'from', 'with', 'for',
+    'are', 'was', 'were', 'been', 'being', 'have', 'has', 'had',
+    'refers', 'literally', 'also', 'known', 'called', 'means',
+    'described', 'defined', 'indicates'
+})
+
+def load_json(path: Path):
+    """Read and parse one JSON file (UTF-8)"""
+    with open(path, 'rb') as f:
+        return _loads(f.read())
+
+# Definition markers for each category, in priority order; each category's
+# markers are compiled into one alternation, so categorize_term runs at most
+# one regex search per category
+CATEGORY_MARKERS = [
+    ('herbs', ['herb', 'plant', 'root', 'leaf', 'botanical', 'flower', 'seed']),
+    ('treatments', ['treatment', 'therapy', 'procedure', 'science of', 'formulation', 'remedy']),
+    ('diseases', ['disease', 'disorder', 'condition', 'ailment', 'affliction', 'illness']),
+    ('symptoms', ['pain', 'ache', 'fever', 'cough', 'inflammation', 'swelling']),
+    ('physiology', ['dosha', 'tissue', 'channel', 'bodily', 'vital', 'energy', 'body']),
+]
+_CATEGORY_RES = [
+    (category, re.compile('|'.join(map(re.escape, markers))))
+    for category, markers in CATEGORY_MARKERS
+]
+
+# Common transliteration variations, one table per spelling variant
+# (ā → aa, ī → ee, ū → uu, ṛ → ri); each is a single str.translate call
+_TRANSLITERATION_TABLES = [
+    str.maketrans({'ā': 'aa', 'Ā': 'aa'}),
+    str.maketrans({'ī': 'ee', 'Ī': 'ee'}),
+    str.maketrans({'ū': 'uu', 'Ū': 'uu'}),
+    str.maketrans({'ṛ': 'ri', 'Ṛ': 'ri'}),
+]
+
+def _strip_marks(text: str) -> str:
+    """Uncached diacritic stripping, for one-off text such as definitions"""
+    if text.isascii():
+        return text  # nothing to decompose or strip
+    return unicodedata.normalize('NFD', text).translate(_MN_TABLE)
+
+# Terms and their transliterations repeat across chapters, so both helpers
+# below are memoized; the same few thousand strings are normalized over and over.
+# Definitions are nearly all unique and go through _strip_marks instead, so they
+# never evict the terms from these caches
+@functools.lru_cache(maxsize=65536)
 def normalize_diacritics(text: str) -> str:
     """Remove diacritical marks from text (āṃḥṛṇṭḍśṣ → amhrntsds)"""
-    nfd = unicodedata.normalize('NFD', text)
-    without_diacritics = ''.join(
-        char for char in nfd 
-        if unicodedata.category(char) != 'Mn'
-    )
-    return without_diacritics
-
-def extract_english_terms(text: str) -> List[str]:
+    return _strip_marks(text)
+
+@functools.lru_cache(maxsize=65536)
+def _norm_lower(text: str) -> str:
+    """Lower-cased normalize_diacritics(), the key terms are matched by"""
+    return normalize_diacritics(text).lower()
+
+def extract_english_terms(text: str, limit: Optional[int] = None) -> List[str]:
     """
     Extract English words from definition text
-    Filters out common stop words
+    Filters out common stop words; stops scanning after `limit` words if given
     """
-    text_cleaned = normalize_diacritics(text).lower()
+    text_cleaned = _strip_marks(text).lower()
     
-    # Extract words (alphanumeric + hyphen)
-    words = re.findall(r'\b[a-z][a-z-]{2,}\b', text_cleaned)
+    # Extract words (alphanumeric + hyphen); the regex already requires 4+ chars
+    words = (match.group() for match in _WORD_RE.finditer(text_cleaned))
     
     # Filter out common stop words
-    stop_words = {
-        'the', 'and', 'that', 'which', 'this', 'from', 'with', 'for',
-        'are', 'was', 'were', 'been', 'being', 'have', 'has', 'had',
-        'refers', 'literally', 'also', 'known', 'called', 'means',
-        'described', 'defined', 'indicates'
-    }
-    
-    meaningful_words = [w for w in words if w not in stop_words and len(w) > 3]
+    meaningful_words = (w for w in words if w not in _STOP_WORDS)
     
-    return meaningful_words
+    return list(itertools.islice(meaningful_words, limit))
 
 def generate_variants(term: str, definition: str) -> List[str]:
     """
@@ -86,26 +155,21 @@ def generate_variants(term: str, definition: str) -> List[str]:
     variants = set()
     
     # Add normalized version (remove diacritics)
-    normalized = normalize_diacritics(term).lower()
+    normalized = _norm_lower(term)
     variants.add(normalized)
     
     # Add common transliteration variations
     # ā → aa, ī → ee, ū → uu, ṛ → ri
-    transliterations = [
-        term.replace('ā', 'aa').replace('Ā', 'aa'),
-        term.replace('ī', 'ee').replace('Ī', 'ee'),
-        term.replace('ū', 'uu').replace('Ū', 'uu'),
-        term.replace('ṛ', 'ri').replace('Ṛ', 'ri'),
-    ]
-    
-    for trans in transliterations:
-        variants.add(normalize_diacritics(trans).lower())
+    # (an ASCII term has none of these letters; every variant would equal normalized)
+    if not term.isascii():
+        for table in _TRANSLITERATION_TABLES:
+            variants.add(_norm_lower(term.translate(table)))
     
     # Extract English terms from definition (first 200 chars)
-    english_terms = extract_english_terms(definition[:200])
+    english_terms = extract_english_terms(definition[:200], limit=8)
     
     # Add most relevant English terms (up to 8)
-    for english_term in english_terms[:8]:
+    for english_term in english_terms:
         variants.add(english_term)
         # Add plural
         if not english_term.endswith('s'):
@@ -121,42 +185,59 @@ def generate_variants(term: str, definition: str) -> List[str]:
 
 def categorize_term(term_name: str, definition: str) -> str:
     """Auto-categorize based on term patterns and definition"""
-    term_lower = term_name.lower()
     def_lower = definition.lower()
     
-    # Herb indicators
-    if any(marker in def_lower for marker in ['herb', 'plant', 'root', 'leaf', 'botanical', 'flower', 'seed']):
-        return 'herbs'
-    
-    # Treatment indicators
-    if any(marker in def_lower for marker in ['treatment', 'therapy', 'procedure', 'science of', 'formulation', 'remedy']):
-        return 'treatments'
-    
-    # Disease indicators
-    if any(marker in def_lower for marker in ['disease', 'disorder', 'condition', 'ailment', 'affliction', 'illness']):
-        return 'diseases'
-    
-    # Symptom indicators
-    if any(marker in def_lower for marker in ['pain', 'ache', 'fever', 'cough', 'inflammation', 'swelling']):
-        return 'symptoms'
-    
-    # Physiology indicators
-    if any(marker in def_lower for marker in ['dosha', 'tissue', 'channel', 'bodily', 'vital', 'energy', 'body']):
-        return 'physiology'
+    # Herb, treatment, disease, symptom, then physiology indicators
+    for category, marker_re in _CATEGORY_RES:
+        if marker_re.search(def_lower):
+            return category
     
     return 'concepts'
 
-def extract_related_concepts(all_concept_names: Set[str], definition: str) -> List[str]:
-    """Find mentions of other concepts in this definition"""
-    related = []
-    
-    for other_concept in all_concept_names:
-        if other_concept in definition and len(other_concept) > 3:
-            related.append(other_concept)
-            if len(related) >= 5:
-                break
+def build_concept_matcher(all_concept_names: Set[str]):
+    """
+    Prepare the concept names (longer than 3 chars) for extract_related_concepts:
+    an Aho-Corasick automaton that finds every mention in one pass over a
+    definition, or the plain list of names when pyahocorasick is not installed
+    """
+    names = [name for name in all_concept_names if len(name) > 3]
+    if ahocorasick is None or not names:
+        return names
+    
+    automaton = ahocorasick.Automaton()
+    for name in names:
+        automaton.add_word(name, name)
+    automaton.make_automaton()
+    return automaton
+
+def extract_related_concepts(concept_matcher, definition: str) -> List[str]:
+    """
+    Find mentions of other concepts in this definition (up to 5), in the
+    order they end in the text; the longer name first when two end together
+    """
+    if isinstance(concept_matcher, list):
+        found = [name for name in concept_matcher if name in definition]
+        found.sort(key=lambda name: (definition.index(name) + len(name), -len(name)))
+        return found[:5]
     
-    return related
+    related = dict.fromkeys(name for _, name in concept_matcher.iter(definition))
+    return list(related)[:5]
+
+def _walk_json_files(root: str):
+    """
+    Yield the path string of every .json file under root: a folder's own files
+    first, then each subfolder in turn (the order rglob used). DirEntry answers
+    is_dir() from the listing, and only the results become Path objects.
+    """
+    subfolders = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subfolders.append(entry.path)
+            elif entry.name.endswith('.json'):
+                yield entry.path
+    for subfolder in subfolders:
+        yield from _walk_json_files(subfolder)
 
 def find_all_chapter_files() -> List[Path]:
     """
@@ -172,18 +253,21 @@ def find_all_chapter_files() -> List[Path]:
             continue
         
         # Find all JSON files recursively
-        json_files = list(scripture_path.rglob("*.json"))
+        json_files = [Path(path) for path in _walk_json_files(scripture_path)]
         all_files.extend(json_files)
         
         print(f"📖 {scripture}: found {len(json_files)} chapter files")
     
     return all_files
 
-def process_chapter_file(filepath: Path, all_concept_names: Set[str]) -> List[Dict]:
-    """Extract dictionary entries from a single chapter JSON file"""
+def process_chapter_file(filepath: Path, data, concept_matcher) -> List[Dict]:
+    """
+    Extract dictionary entries from a single chapter JSON file, already parsed
+    by pass 1 (data is the exception instead if it could not be read)
+    """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if isinstance(data, Exception):
+            raise data
         
         # FIX: keyConcepts is at ROOT level, not under metadata
         key_concepts = data.get('keyConcepts', [])
@@ -206,8 +290,10 @@ def process_chapter_file(filepath: Path, all_concept_names: Set[str]) -> List[Di
                 "category": categorize_term(term_name, definition),
                 "variants": generate_variants(term_name, definition),
                 "description": definition[:250],  # Truncate to 250 chars
-                "relatedConcepts": extract_related_concepts(all_concept_names, definition),
-                "doshaAssociations": []
+                "relatedConcepts": extract_related_concepts(concept_matcher, definition),
+                "doshaAssociations": [],
+                # Dedup / merge key, computed once here; removed before writing
+                "_key": _norm_lower(term_name)
             }
             
             dictionary_entries.append(entry)
@@ -218,13 +304,32 @@ def process_chapter_file(filepath: Path, all_concept_names: Set[str]) -> List[Di
         print(f"⚠️  Error processing {filepath.name}: {e}")
         return []
 
+# Each pass-2 worker process receives the concept matcher once, through the
+# pool initializer, instead of with every chapter file
+_worker_concept_matcher = None
+
+def _init_worker(concept_matcher):
+    global _worker_concept_matcher
+    _worker_concept_matcher = concept_matcher
+
+def _process_chapter_file_in_worker(chapter: tuple):
+    """
+    process_chapter_file for one (filepath, data) pair in a worker process;
+    returns (entries, printed text) so the main process prints the messages
+    in file order
+    """
+    filepath, data = chapter
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        entries = process_chapter_file(filepath, data, _worker_concept_matcher)
+    return entries, output.getvalue()
+
 
 def load_existing_dictionary() -> List[Dict]:
     """Load current manual dictionary"""
     try:
-        with open(CURRENT_DICT_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get('terms', [])
+        data = load_json(CURRENT_DICT_PATH)
+        return data.get('terms', [])
     except FileNotFoundError:
         print(f"ℹ️  No existing dictionary found at {CURRENT_DICT_PATH}")
         return []
@@ -240,7 +345,7 @@ def merge_dictionaries(manual_terms: List[Dict], auto_terms: List[Dict]) -> List
     # Index manual terms by normalized name
     manual_index = {}
     for term in manual_terms:
-        key = normalize_diacritics(term['term']).lower()
+        key = _norm_lower(term['term'])
         manual_index[key] = term
     
     # Start with manual terms
@@ -249,7 +354,7 @@ def merge_dictionaries(manual_terms: List[Dict], auto_terms: List[Dict]) -> List
     # Add auto-generated terms that don't conflict
     added = 0
     for auto_term in auto_terms:
-        key = normalize_diacritics(auto_term['term']).lower()
+        key = auto_term['_key']
         
         if key not in manual_index:
             merged.append(auto_term)
@@ -289,48 +394,56 @@ def main():
     
     print(f"\n✅ Total: {len(chapter_files)} chapter files found\n")
     
-    # First pass: collect all concept names
+    # First pass: parse every chapter file once and collect all concept names;
+    # pass 2 reuses the parsed data (or the read error) instead of re-reading
     print("🔍 Pass 1: Collecting unique concepts...")
     all_concept_names = set()
+    chapters = []
 
     for filepath in chapter_files:
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # FIX: keyConcepts at root level
-                key_concepts = data.get('keyConcepts', [])
-                for concept in key_concepts:
-                    term_name = concept.get('term', '')
-                    if term_name:
-                        all_concept_names.add(term_name)
+            data = load_json(filepath)
+        except Exception as e:
+            data = e
+        chapters.append((filepath, data))
+        try:
+            # FIX: keyConcepts at root level
+            key_concepts = data.get('keyConcepts', [])
+            for concept in key_concepts:
+                term_name = concept.get('term', '')
+                if term_name:
+                    all_concept_names.add(term_name)
         except:
             pass
 
     
     print(f"✅ Found {len(all_concept_names)} unique concepts\n")
+    concept_matcher = build_concept_matcher(all_concept_names)
     
     # Second pass: extract dictionary entries
     print("📝 Pass 2: Extracting dictionary entries...")
     all_auto_entries = []
     
-    for i, filepath in enumerate(chapter_files, 1):
-        entries = process_chapter_file(filepath, all_concept_names)
-        all_auto_entries.extend(entries)
-        
-        if i % 20 == 0:
-            print(f"   Processed {i}/{len(chapter_files)} files...")
+    # map() hands back each file's entries in chapter_files order
+    with ProcessPoolExecutor(
+        max_workers=MAX_WORKERS, initializer=_init_worker, initargs=(concept_matcher,)
+    ) as executor:
+        results = executor.map(_process_chapter_file_in_worker, chapters, chunksize=8)
+        for i, (entries, output) in enumerate(results, 1):
+            sys.stdout.write(output)
+            all_auto_entries.extend(entries)
+            
+            if i % 20 == 0:
+                print(f"   Processed {i}/{len(chapter_files)} files...")
     
     print(f"\n✅ Extracted {len(all_auto_entries)} dictionary entries\n")
     
-    # Deduplicate auto entries
-    seen_terms = {}
-    unique_auto_entries = []
-    
-    for entry in all_auto_entries:
-        key = normalize_diacritics(entry['term']).lower()
-        if key not in seen_terms:
-            seen_terms[key] = entry
-            unique_auto_entries.append(entry)
+    # Deduplicate auto entries (first entry per key wins; only the keys are kept)
+    seen_keys = set()
+    unique_auto_entries = [
+        entry for entry in all_auto_entries
+        if (key := entry['_key']) not in seen_keys and not seen_keys.add(key)
+    ]
     
     print(f"📊 After deduplication: {len(unique_auto_entries)} unique terms\n")
     
@@ -348,6 +461,10 @@ def main():
     print(f"   - Auto-generated new: {len(merged_terms) - len(manual_terms)}")
     print(f"   - Total coverage increase: {((len(merged_terms) - len(manual_terms)) / max(len(manual_terms), 1)) * 100:.0f}%\n")
     
+    # Drop the scratch dedup keys before writing
+    for term in merged_terms:
+        term.pop('_key', None)
+    
     # Write output
     output_data = {
         "terms": merged_terms,
@@ -364,8 +481,8 @@ def main():
     
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    with open(OUTPUT_PATH, 'wb') as f:
+        f.write(_dumps(output_data))
     
     print(f"💾 Wrote enriched dictionary to:\n   {OUTPUT_PATH}\n")
     print("🎉 SUCCESS!\n")
@@ -0,0 +1,34 @@
+"""
+JSON helpers shared by the scripts in this folder.
+
+orjson is optional: with it installed, loads() and dumps() are several times
+faster; without it they fall back to the stdlib json module. dumps() writes
+UTF-8 with a two-space indent and non-ASCII kept as-is either way.
+
+The two backends give the same bytes for the payloads these scripts write
+(strings, ints, bools, None, lists and dicts). They are not interchangeable for
+every value: floats can be spelled differently (orjson writes 1e20 where json
+writes 1e+20), and orjson writes NaN and Infinity as null where json writes
+the non-standard NaN / Infinity literals.
+"""
+
+import json
+
+try:
+    import orjson
+
+    def loads(data):
+        """Parse JSON from str or bytes."""
+        return orjson.loads(data)
+
+    def dumps(obj) -> bytes:
+        """Serialise to indented UTF-8 JSON; non-str dict keys become strings."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def loads(data):
+        """Parse JSON from str or bytes."""
+        return json.loads(data)
+
+    def dumps(obj) -> bytes:
+        """Serialise to indented UTF-8 JSON; non-str dict keys become strings."""
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,522 @@
+"""
+Shared engine for the chapter manifest generators.
+
+Every generate_chapter_manifest_<scripture>.py script used to carry its own copy
+of the scan / validate / save boilerplate. That now lives here, and each script
+only describes what is specific to its scripture in a ScriptureConfig:
+
+    find_sections(root_path)    -> ordered list of section items (usually folders)
+    process_section(item, ctx)  -> (section_entry or None, log lines)
+    assemble_sections(entries)  -> section entries (optional; for scriptures whose
+                                   items are chapters rather than sections)
+
+Sections are processed on a thread pool. Each worker returns its log lines
+instead of printing, so the console output reads exactly like a serial run.
+ctx.pool is a second, shared pool for per-chapter I/O inside a section.
+
+Run a single scripture with its own script, or several in one process with
+build_all_manifests.py [--scripture ID ...].
+"""
+
+import hashlib
+import os
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from operator import attrgetter, itemgetter
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+# orjson is optional; see json_compat for when the two backends agree
+from json_compat import dumps as _dumps, loads as _loads
+
+# pysimdjson is optional as well. It is only used by read_chapter_title, which
+# needs one key out of each metadata file and can skip building the whole dict.
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+# xxhash is optional; folder fingerprints only need to be fast, not cryptographic
+try:
+    import xxhash
+
+    def _new_hash():
+        return xxhash.xxh64()
+except ImportError:
+    def _new_hash():
+        return hashlib.md5()
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+GCS_BUCKET = "gs://mygurukul-sacred-texts-corpus"
+
+# Manifest scans only touch the local filesystem and are I/O-bound. They are
+# deliberately not throttled; any pacing belongs in the GCS upload step.
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+@dataclass(frozen=True)
+class ScriptureConfig:
+    """Everything the shared engine needs to know about one scripture."""
+
+    scripture_id: str
+    scripture_name: str
+    root: Path
+    gcs_base_path: str
+    display_name: str             # banner text, e.g. "ARTHASHASTRA"
+    section_label: str            # "Book", "Canto", "Section", ...
+    find_sections: Callable[[Path], list]
+    process_section: Callable[[Any, "ScanContext"], Tuple[Optional[dict], list]]
+    output_path: Path
+    gcs_bucket: str = GCS_BUCKET
+    on_start: Optional[Callable[["ScanContext"], None]] = None
+    on_finish: Optional[Callable[["ScanContext"], None]] = None
+    next_steps: Tuple[str, ...] = ()
+    folder_label: Optional[str] = None    # what find_sections finds; defaults to section_label
+    assemble_sections: Optional[Callable[[list], list]] = None
+    # Re-sort the sections numerically by sectionId; only for scriptures whose
+    # find_sections returns folders in name order (Book_10 before Book_2)
+    sort_sections: bool = False
+
+    @property
+    def gcs_root_url(self) -> str:
+        return f"{self.gcs_bucket}/{self.gcs_base_path}"
+
+
+@dataclass
+class ScanContext:
+    """Per-run state handed to every process_section call."""
+
+    config: ScriptureConfig
+    root_path: Path
+    pool: ThreadPoolExecutor
+    state: Any = None             # free for the scripture's on_start / on_finish hooks
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+
+def read_json_bytes(json_path: Path):
+    """Return the raw bytes of json_path, or the OSError raised while reading it."""
+    try:
+        return json_path.read_bytes()
+    except OSError as exc:
+        return exc
+
+
+def walk_tree(root_path: Path, max_depth: int) -> dict:
+    """
+    Index the tree under root_path with a single os.walk, at most max_depth folders deep.
+    Returns {folder path relative to root_path: (sub-folder names, frozenset of file names)};
+    the root itself is Path(".").
+
+    Symlinked folders are followed, as Path.iterdir() / is_dir() would, and a folder
+    that cannot be listed is indexed as empty, so every listed sub-folder has a key.
+    """
+    tree = {}
+
+    def unreadable(exc: OSError) -> None:
+        tree[Path(exc.filename).relative_to(root_path)] = ((), frozenset())
+
+    for dirpath, dirnames, filenames in os.walk(root_path, onerror=unreadable, followlinks=True):
+        rel = Path(dirpath).relative_to(root_path)
+        tree[rel] = (tuple(dirnames), frozenset(filenames))
+        if len(rel.parts) >= max_depth:
+            dirnames[:] = []  # don't descend any further
+    return tree
+
+
+def read_files(paths, pool: Optional[ThreadPoolExecutor] = None) -> dict:
+    """
+    Read every path in one batch on a thread pool: {path: bytes or the OSError raised}.
+    Uses pool if given (e.g. ctx.pool), otherwise a short-lived one.
+    """
+    paths = list(paths)
+    if not paths:
+        return {}
+    if pool is not None:
+        return dict(zip(paths, pool.map(read_json_bytes, paths)))
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(paths))) as pool:
+        return dict(zip(paths, pool.map(read_json_bytes, paths)))
+
+
+# A simdjson Parser is not thread-safe and each parse invalidates the document
+# it returned before, so every thread keeps and reuses its own
+_thread_local = threading.local()
+
+
+def read_chapter_title(raw: bytes, default=None):
+    """
+    Return the "chapterTitle" value of a metadata JSON blob, or default if the
+    key is absent. Raises ValueError if the blob is not a JSON object.
+
+    The whole blob is always parsed: callers treat a truncated or corrupt
+    sidecar (e.g. from an interrupted metadata run) as missing metadata, so
+    the title alone must never vouch for the file.
+    """
+    if simdjson is None:
+        data = _loads(raw)
+        if not isinstance(data, dict):
+            raise ValueError("metadata JSON is not an object")
+        return data.get("chapterTitle", default)
+
+    parser = getattr(_thread_local, "parser", None)
+    if parser is None:
+        parser = _thread_local.parser = simdjson.Parser()
+    doc = parser.parse(raw)
+    if not isinstance(doc, simdjson.Object):
+        raise ValueError("metadata JSON is not an object")
+    value = doc.get("chapterTitle", default)
+    # Containers are lazy views into the parser's buffer; copy them out
+    if isinstance(value, simdjson.Object):
+        value = value.as_dict()
+    elif isinstance(value, simdjson.Array):
+        value = value.as_list()
+    del doc  # release the parser's document before the next parse
+    return value
+
+
+def write_bytes(path: Path, data: bytes) -> None:
+    """
+    Write data to path with os.write on a raw descriptor. Manifests are already
+    serialised to bytes, so the BufferedWriter behind Path.write_bytes adds nothing.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def write_json_atomic(json_path: Path, data) -> None:
+    """Write JSON via a temp file so an interrupted run never truncates it."""
+    tmp_path = json_path.with_name(json_path.name + ".tmp")
+    write_bytes(tmp_path, _dumps(data))
+    os.replace(tmp_path, json_path)
+
+
+def list_folder(folder: Path) -> frozenset:
+    """Names of the regular files in folder, from a single os.scandir."""
+    with os.scandir(folder) as entries:
+        return frozenset(entry.name for entry in entries if entry.is_file())
+
+
+def list_pdfs(folder: Path) -> tuple:
+    """
+    List folder once and return (sorted PDF names, frozenset of all file names).
+    A PDF's JSON sibling is then a set lookup, not a stat():
+    pdf_name[:-4] + ".json" in file_names.
+    """
+    file_names = list_folder(folder)
+    return sorted(name for name in file_names if name.endswith(".pdf")), file_names
+
+
+# ============================================================================
+# SECTION CACHE
+# ============================================================================
+
+# Section entries from the previous run, keyed by section folder name and stamped
+# with a fingerprint of the folder. A rerun copies the entry of every folder whose
+# fingerprint still matches instead of re-reading its chapters. Delete it to
+# force a full rebuild.
+SECTION_CACHE_NAME = ".manifest.cache.json"
+
+
+def _hash_folder(h, folder, prefix: str, depth: int) -> None:
+    with os.scandir(folder) as entries:
+        entries = sorted(entries, key=attrgetter("name"))
+    for entry in entries:
+        st = entry.stat()
+        h.update(f"{prefix}{entry.name}|{st.st_mtime_ns}|{st.st_size}\n".encode("utf-8"))
+        if depth and entry.is_dir():
+            _hash_folder(h, entry.path, f"{prefix}{entry.name}/", depth - 1)
+
+
+def folder_fingerprint(folder: Path, salt: str = "", depth: int = 0) -> str:
+    """
+    Hash the (name, mtime, size) of every entry in folder and, up to depth levels
+    down, in its sub-folders. salt is mixed in so a changed URL prefix (or any
+    other input the entries depend on) also invalidates the cache.
+    """
+    h = _new_hash()
+    h.update(salt.encode("utf-8"))
+    _hash_folder(h, folder, "", depth)
+    return h.hexdigest()
+
+
+def load_section_cache(root_path: Path) -> dict:
+    """Return the previous run's section cache, or {} if it is missing or unreadable."""
+    try:
+        cache = _loads((root_path / SECTION_CACHE_NAME).read_bytes())
+    except (FileNotFoundError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_section_cache(root_path: Path, cache: dict) -> None:
+    write_json_atomic(root_path / SECTION_CACHE_NAME, cache)
+
+
+def start_section_cache(ctx: "ScanContext") -> None:
+    """on_start hook: ctx.state becomes (old_cache, new_cache) for process_section."""
+    ctx.state = (load_section_cache(ctx.root_path), {})
+
+
+def finish_section_cache(ctx: "ScanContext") -> None:
+    """on_finish hook: save the new cache if any section changed."""
+    old_cache, new_cache = ctx.state
+    if new_cache != old_cache:
+        save_section_cache(ctx.root_path, new_cache)
+
+
+# ============================================================================
+# MANIFEST GENERATION
+# ============================================================================
+
+
+def single_section(chapter_rows: list, section_id: str, section_name: str, title_english: bool = False) -> list:
+    """
+    assemble_sections helper for scriptures whose items are the chapter folders
+    of one section. chapter_rows are (chapter_num, title, metadata_url, pdf_url,
+    has_metadata) in folder order; a row without a chapter number takes its
+    position. title_english adds a "titleEnglish" copy of each title.
+    """
+    if not chapter_rows:
+        return []
+
+    # Fix every chapter's number first, then sort the small tuples (stably)
+    # and build the entries in their final order
+    numbered_rows = sorted(
+        [(chapter_num or position, *rest) for position, (chapter_num, *rest) in enumerate(chapter_rows, 1)],
+        key=itemgetter(0),
+    )
+    chapters = []
+    for chapter_num, title, metadata_url, pdf_url, has_metadata in numbered_rows:
+        chapter_entry = {"chapterId": str(chapter_num), "chapterNumber": chapter_num, "title": title}
+        if title_english:
+            chapter_entry["titleEnglish"] = title
+        chapter_entry["metadataUrl"] = metadata_url
+        chapter_entry["pdfUrl"] = pdf_url
+        chapter_entry["hasMetadata"] = has_metadata
+        chapters.append(chapter_entry)
+
+    return [
+        {
+            "sectionId": section_id,
+            "sectionName": section_name,
+            "sectionNameEnglish": section_name,
+            "chapterCount": len(chapters),
+            "chapters": chapters,
+        }
+    ]
+
+
+def generate_chapter_manifest(config: ScriptureConfig):
+    """Scan config.root and return the manifest dict, or None on failure."""
+    label = config.section_label
+    folder_label = config.folder_label or label
+
+    print("=" * 80)
+    print(f"CHAPTER MANIFEST GENERATOR - {config.display_name}")
+    print("=" * 80)
+    print(f"Scripture: {config.scripture_name}")
+    print(f"Root Directory: {config.root}")
+    print(f"GCS Bucket: {config.gcs_bucket}")
+    print(f"GCS Path: {config.gcs_base_path}")
+    print("=" * 80)
+
+    root_path = Path(config.root)
+    if not root_path.exists():
+        print(f"❌ Error: Directory does not exist: {config.root}")
+        return None
+
+    print(f"\n🔎 Scanning for {folder_label} folders...")
+    section_items = config.find_sections(root_path)
+
+    if not section_items:
+        print(f"❌ Error: No {folder_label} folders found in {config.root}")
+        return None
+
+    print(f"✅ Found {len(section_items)} {folder_label} folder(s)")
+
+    manifest = {
+        "scriptureId": config.scripture_id,
+        "scriptureName": config.scripture_name,
+        "totalChapters": 0,
+        "lastUpdated": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "sections": [],
+    }
+
+    # Process the sections in parallel (map keeps section order for the log);
+    # per-chapter I/O goes to a separate pool so section workers never wait on
+    # their own executor
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool, \
+            ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(section_items))) as executor:
+        ctx = ScanContext(config=config, root_path=root_path, pool=pool)
+        if config.on_start:
+            config.on_start(ctx)
+
+        # Each folder's log is kept and the whole scan is written in one go
+        # (also if a worker raises), instead of one print per folder
+        entries = []
+        log_blocks = []
+        try:
+            for entry, log in executor.map(config.process_section, section_items, [ctx] * len(section_items)):
+                log_blocks.append("\n".join(log))
+                if entry is not None:
+                    entries.append(entry)
+        finally:
+            sys.stdout.write("\n".join(log_blocks) + "\n")
+
+        if config.on_finish:
+            config.on_finish(ctx)
+
+    if config.assemble_sections:
+        entries = config.assemble_sections(entries)
+    manifest["sections"] = entries
+    manifest["totalChapters"] = sum(section["chapterCount"] for section in entries)
+
+    # Sort sections by section ID (numeric); everyone else's find_sections
+    # order is already the final section order
+    if config.sort_sections:
+        try:
+            manifest["sections"].sort(key=lambda x: int(x["sectionId"]))
+        except ValueError:
+            pass  # If section IDs are not numeric, keep original order
+
+    if not manifest["sections"]:
+        print("❌ No sections were processed successfully")
+        return None
+
+    print(f"\n✅ Compiled {manifest['totalChapters']} total chapter(s) across {len(manifest['sections'])} {label}(s)")
+    return manifest
+
+
+# ============================================================================
+# VALIDATION
+# ============================================================================
+
+
+def validate_manifest(manifest, section_label="Section"):
+    """Validate the generated manifest for completeness."""
+    print("\n" + "=" * 80)
+    print("VALIDATING MANIFEST")
+    print("=" * 80)
+
+    if not manifest:
+        print("❌ Manifest is empty or None")
+        return False
+
+    required_fields = ["scriptureId", "scriptureName", "totalChapters", "sections"]
+    for field in required_fields:
+        if field not in manifest:
+            print(f"❌ Missing required field: {field}")
+            return False
+
+    if len(manifest["sections"]) == 0:
+        print("❌ No sections found in manifest")
+        return False
+
+    print(f"✅ Scripture ID: {manifest['scriptureId']}")
+    print(f"✅ Scripture Name: {manifest['scriptureName']}")
+    print(f"✅ Total Chapters: {manifest['totalChapters']}")
+    print(f"✅ Total Sections: {len(manifest['sections'])}")
+
+    # Validate each section
+    chapters_with_metadata = 0
+    chapters_without_metadata = 0
+
+    for section in manifest["sections"]:
+        print(f"\n   {section_label} {section['sectionId']}: {section['sectionName']}")
+        print(f"      Chapters: {section['chapterCount']}")
+
+        if section.get("chapterCount", 0) != len(section.get("chapters", [])):
+            print("      ❌ Chapter count mismatch")
+            return False
+
+        for chapter in section["chapters"]:
+            if chapter.get("hasMetadata", False):
+                chapters_with_metadata += 1
+            else:
+                chapters_without_metadata += 1
+
+    total_chapters_in_sections = chapters_with_metadata + chapters_without_metadata
+    if manifest["totalChapters"] != total_chapters_in_sections:
+        print(f"❌ Mismatch: totalChapters is {manifest['totalChapters']} but sections contain {total_chapters_in_sections}")
+        return False
+
+    print(f"\n✅ Chapters with JSON metadata: {chapters_with_metadata}")
+    if chapters_without_metadata > 0:
+        print(f"⚠️ Chapters without JSON metadata: {chapters_without_metadata}")
+
+    print("\n✅ Manifest validation passed!")
+    return True
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+
+def print_banner(text: str) -> None:
+    print("\n")
+    print("╔" + "═" * 60 + "╗")
+    print("║" + " " * 60 + "║")
+    print("║" + text.center(60) + "║")
+    print("║" + " " * 60 + "║")
+    print("╚" + "═" * 60 + "╝")
+    print("\n")
+
+
+def build_manifest(config: ScriptureConfig) -> bool:
+    """Generate, validate and save one scripture's manifest. Returns True on success."""
+    try:
+        manifest = generate_chapter_manifest(config)
+        if manifest is None:
+            print("\n❌ Failed to generate manifest")
+            return False
+
+        if not validate_manifest(manifest, config.section_label):
+            print("\n❌ Manifest validation failed")
+            return False
+
+        output_path = Path(config.output_path)
+        write_bytes(output_path, _dumps(manifest))
+
+        print("\n" + "=" * 80)
+        print("SUCCESS!")
+        print("=" * 80)
+        print(f"✅ Generated: {output_path}")
+        print(f"📊 Total Chapters: {manifest['totalChapters']}")
+        print(f"📚 Total Sections ({config.section_label}s): {len(manifest['sections'])}")
+        print("=" * 80)
+
+        if config.next_steps:
+            print("\n📋 NEXT STEPS:")
+            for line in config.next_steps:
+                print(line)
+            print("\n")
+        return True
+
+    except Exception as exc:
+        print(f"\n❌ Fatal Error: {exc}")
+        traceback.print_exc()
+        return False
+
+
+def run(config: ScriptureConfig) -> None:
+    """Entry point for a single-scripture script."""
+    print_banner(f"MYGURUKUL CHAPTER MANIFEST GENERATOR - {config.display_name}")
+    if not build_manifest(config):
+        sys.exit(1)
@@ -0,0 +1,118 @@
+"""
+Differential tests for the chapter manifest generators in scripts/.
+
+Each tree under fixtures/chapter_manifests/<case>/ is a small scripture library
+(empty PDFs, short metadata sidecars, including unreadable and truncated ones).
+The generator is run against a copy of it twice, cold and then with the caches
+the first run left behind, and both manifests must equal <case>.expected.json
+apart from lastUpdated.
+
+Run with: python -m unittest discover tests
+"""
+
+import contextlib
+import dataclasses
+import importlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "chapter_manifests"
+
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import manifest_core  # noqa: E402
+
+# Fixture tree -> generator module. sushruta_samhita_two_digit has Section_10
+# before Section_2 in name order, so it covers sort_sections; the *_symlinked
+# trees reach some Part / Tantra / story folders through symlinks
+CASES = {
+    "arthasastra": "generate_chapter_manifest_arthasastra",
+    "bhagvata_purana": "generate_chapter_manifest_bhagvata_purana",
+    "carak_samhita": "generate_chapter_manifest_carak_samhita",
+    "kamasutra": "generate_chapter_manifest_kamasutra",
+    "kamasutra_symlinked": "generate_chapter_manifest_kamasutra",
+    "natyashastra": "generate_chapter_manifest_natyashastra",
+    "panchatantra": "generate_chapter_manifest_panchatantra",
+    "panchatantra_symlinked": "generate_chapter_manifest_panchatantra",
+    "ramayana": "generate_chapter_manifest_ramayana",
+    "sushruta_samhita": "generate_chapter_manifest_sushruta_samhita",
+    "sushruta_samhita_two_digit": "generate_chapter_manifest_sushruta_samhita",
+    "vastu_sastra": "generate_chapter_manifest_vastu_sastra",
+    "vedanga_jyotisa": "generate_chapter_manifest_vedanga_jyotisa",
+    "yogasutra": "generate_chapter_manifest_yogasutra",
+}
+
+
+def build_manifest(module_name: str, root: Path):
+    """Return the manifest for root without lastUpdated; the scan log is discarded."""
+    config = dataclasses.replace(
+        importlib.import_module(module_name).CONFIG,
+        root=root,
+        output_path=root / "manifest.json",
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        manifest = manifest_core.generate_chapter_manifest(config)
+    manifest.pop("lastUpdated")
+    return manifest
+
+
+class ChapterManifestTest(unittest.TestCase):
+    maxDiff = None
+
+    def test_manifests_match_expected(self):
+        for case, module_name in CASES.items():
+            with self.subTest(case=case), tempfile.TemporaryDirectory() as tmp:
+                root = Path(tmp) / case
+                shutil.copytree(FIXTURES_DIR / case, root, symlinks=True)
+                expected = json.loads((FIXTURES_DIR / f"{case}.expected.json").read_text(encoding="utf-8"))
+
+                self.assertEqual(build_manifest(module_name, root), expected, "cold run")
+                self.assertEqual(build_manifest(module_name, root), expected, "cached run")
+
+    def test_truncated_sidecar_is_not_metadata(self):
+        # A sidecar cut off mid-write still starts with a valid chapterTitle;
+        # it must be reported as missing metadata, not read for its title
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "panchatantra"
+            shutil.copytree(FIXTURES_DIR / "panchatantra", root, symlinks=True)
+            manifest = build_manifest(CASES["panchatantra"], root)
+
+        chapters = {
+            chapter["pdfUrl"].rsplit("/", 2)[-2]: chapter
+            for section in manifest["sections"]
+            for chapter in section["chapters"]
+        }
+        folder_name = "Panchatantra_WOF_3_Half_Written"
+        half_written = chapters[folder_name]
+        self.assertFalse(half_written["hasMetadata"])
+        self.assertEqual(half_written["metadataUrl"], "")
+        fallback = importlib.import_module(CASES["panchatantra"]).derive_fallback_title(folder_name)
+        self.assertEqual(half_written["title"], fallback)
+
+    def test_unreadable_folder_is_indexed_as_empty(self):
+        # os.walk skips a folder it cannot list; walk_tree must still give it a
+        # key, or the generators' tree[...] lookups raise KeyError
+        scandir = os.scandir
+
+        def failing_scandir(path):
+            if Path(path).name == "Part_2_Sexual_Union":
+                raise PermissionError(13, "Permission denied", str(path))
+            return scandir(path)
+
+        with mock.patch("os.scandir", failing_scandir):
+            tree = manifest_core.walk_tree(FIXTURES_DIR / "kamasutra", max_depth=1)
+
+        self.assertIn("Part_2_Sexual_Union", tree[Path(".")][0])
+        self.assertEqual(tree[Path("Part_2_Sexual_Union")], ((), frozenset()))
+
+
+if __name__ == "__main__":
+    unittest.main()
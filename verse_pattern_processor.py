@@ -8,11 +8,47 @@ import re
 import json
 from typing import List, Dict, Any
 
+# Verse-marker alternatives in priority order. Each list is compiled into one
+# anchored alternation, so a line costs a single match() and, as when the
+# patterns were tried one by one, the first alternative that matches wins.
+STANDARD_MARKERS = [
+    r'\d+\.\d+\.\d+',
+    r'\d+\.\d+',
+    r'\d+\.',
+    r'\d+',
+    r'\d+:\d+',
+    r'\d+:\d+:\d+'
+]
+COMPLEX_MARKERS = [
+    r'\d+\.\d+\.\d+',
+    r'\d+\.\d+',
+    r'\d+\.',
+    r'\d+',
+    r'[१-९]+\.',
+    r'[१-९]+:[१-९]+',
+    r'॥\s*\d+\s*॥',
+    r'॥[१-९]+॥'
+]
+STANDARD_PATTERN = re.compile('^(' + '|'.join(STANDARD_MARKERS) + ')')
+COMPLEX_PATTERN = re.compile('^(' + '|'.join(COMPLEX_MARKERS) + ')')
+IRREGULAR_PATTERN = re.compile(r'^[\d\s\.:-\u0900-\u097F]+$')
+
 class VersePatternProcessor:
     def __init__(self, lookup_table_path: str = 'verse-pattern-lookup-table.json'):
         with open(lookup_table_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
+            # Keep the whole file too; the corpus summary lives outside lookupTable
+            self._raw = data
             self.lookup_table = data.get('lookupTable', data)
+        
+        # Bind each scripture's extractor once, so extract_verses is a single
+        # dict lookup and a direct call
+        self._extractors = {
+            name: (self._extract_complex_verses
+                   if info.get('recommendedParsingStrategy') == 'complex'
+                   else self._extract_standard_verses)
+            for name, info in self.lookup_table['scriptures'].items()
+        }
     
     def get_parsing_strategy(self, scripture_name: str) -> str:
         """Get recommended parsing strategy for a scripture"""
@@ -22,12 +58,8 @@ class VersePatternProcessor:
     
     def extract_verses(self, text: str, scripture_name: str) -> List[Dict[str, Any]]:
         """Extract verses using appropriate strategy"""
-        strategy = self.get_parsing_strategy(scripture_name)
-        
-        if strategy == 'complex':
-            return self._extract_complex_verses(text)
-        else:
-            return self._extract_standard_verses(text)
+        extractor = self._extractors.get(scripture_name, self._extract_standard_verses)
+        return extractor(text)
     
     def _extract_standard_verses(self, text: str) -> List[Dict[str, Any]]:
         """Extract verses using standard patterns"""
@@ -40,23 +72,14 @@ class VersePatternProcessor:
                 continue
                 
             # Try standard patterns
-            for pattern in [
-                r'^(\d+\.\d+\.\d+)',
-                r'^(\d+\.\d+)',
-                r'^(\d+\.)',
-                r'^(\d+)',
-                r'^(\d+:\d+)',
-                r'^(\d+:\d+:\d+)'
-            ]:
-                match = re.match(pattern, line)
-                if match:
-                    verses.append({
-                        'marker': match.group(1),
-                        'content': line,
-                        'line_number': line_num,
-                        'type': 'verse'
-                    })
-                    break
+            match = STANDARD_PATTERN.match(line)
+            if match:
+                verses.append({
+                    'marker': match.group(1),
+                    'content': line,
+                    'line_number': line_num,
+                    'type': 'verse'
+                })
         
         return verses
     
@@ -71,34 +94,22 @@ class VersePatternProcessor:
                 continue
                 
             # Try complex patterns
-            for pattern in [
-                r'^(\d+\.\d+\.\d+)',
-                r'^(\d+\.\d+)',
-                r'^(\d+\.)',
-                r'^(\d+)',
-                r'^([१-९]+\.)',
-                r'^([१-९]+:[१-९]+)',
-                r'^(॥\s*\d+\s*॥)',
-                r'^(॥[१-९]+॥)'
-            ]:
-                match = re.match(pattern, line)
-                if match:
-                    verses.append({
-                        'marker': match.group(1),
-                        'content': line,
-                        'line_number': line_num,
-                        'type': 'verse'
-                    })
-                    break
-            else:
-                # Fallback for irregular patterns
-                if len(line) < 20 and re.match(r'^[\d\s\.:-\u0900-\u097F]+$', line):
-                    verses.append({
-                        'marker': line,
-                        'content': line,
-                        'line_number': line_num,
-                        'type': 'irregular'
-                    })
+            match = COMPLEX_PATTERN.match(line)
+            if match:
+                verses.append({
+                    'marker': match.group(1),
+                    'content': line,
+                    'line_number': line_num,
+                    'type': 'verse'
+                })
+            # Fallback for irregular patterns
+            elif len(line) < 20 and IRREGULAR_PATTERN.match(line):
+                verses.append({
+                    'marker': line,
+                    'content': line,
+                    'line_number': line_num,
+                    'type': 'irregular'
+                })
         
         return verses
     
@@ -121,6 +132,10 @@ class VersePatternProcessor:
     def get_preprocessing_templates(self) -> Dict[str, Any]:
         """Get preprocessing templates for different strategies"""
         return self.lookup_table['preprocessingTemplates']
+    
+    def get_summary(self) -> Dict[str, Any]:
+        """Get the corpus summary stored alongside the lookup table"""
+        return self._raw['summary']
 
 # Example usage and demonstration
 if __name__ == "__main__":
@@ -131,10 +146,8 @@ if __name__ == "__main__":
     print("=" * 80)
     
     print(f"\n📊 CORPUS SUMMARY:")
-    # Get summary from the outer structure
-    with open('verse-pattern-lookup-table.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        summary = data['summary']
+    # Get summary from the outer structure (already parsed by the processor)
+    summary = processor.get_summary()
     print(f"   • Total Scriptures: {summary['totalScriptures']}")
     print(f"   • Total Files: {summary['totalFiles']}")
     print(f"   • Total Patterns: {summary['totalPatterns']}")